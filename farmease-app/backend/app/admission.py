@@ -0,0 +1,207 @@
+"""
+FarmEase Backend — Admission Control
+────────────────────────────────────
+Sheds load at the door instead of letting slow requests pile up behind
+each other until everything times out.
+
+  • every route group has a concurrency budget; a request that finds its
+    group full is answered 429 immediately, with Retry-After
+  • budgets adapt to latency (AIMD): a response slower than the group's
+    target shrinks the limit by 10% (at most once per latency window),
+    and each fast response while the limit is in use grows it by 1/limit,
+    back up to the configured budget
+  • priority classes share one global in-flight cap: inference routes may
+    only fill part of it, so the marketplace and weather always have
+    headroom; past the cap requests get 503. Health, metrics, docs and
+    the disease job endpoints ("critical") are never limited
+
+Latency is measured from the end of the request body to the start of the
+response, so a slow 2G upload does not read as server overload.
+"""
+
+import math
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# path prefix → (group, priority); first match wins, anything else is
+# critical. Critical routes skip admission but are still rate-limited by
+# group: job submission only enqueues (the job queue bounds itself) and
+# shares the disease quota; job polls may long-poll.
+ROUTES = (
+    ("/predict/disease/jobs/", "disease_jobs", "critical"),
+    ("/predict/disease/jobs", "disease", "critical"),
+    ("/predict/disease", "disease", "inference"),
+    ("/predict/crop/batch", "crop_batch", "inference"),
+    ("/predict/crop", "crop", "inference"),
+    ("/predict/fertilizer", "fertilizer", "inference"),
+    ("/api/weather", "weather", "interactive"),
+    ("/api/marketplace", "marketplace", "interactive"),
+)
+
+
+def route_for(path: str) -> Optional[tuple[str, str]]:
+    """(group, priority) of a request path, or None for unlisted routes."""
+    for prefix, group, priority in ROUTES:
+        if path.startswith(prefix):
+            return group, priority
+    return None
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit for one route group."""
+
+    def __init__(self, max_limit: int, target_ms: float, backoff: float = 0.9):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, self.max_limit // 8)
+        self.target_s = target_ms / 1000
+        self.backoff = backoff
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.latency_s = 0.0  # EWMA of served latency
+        self._last_decrease = 0.0
+        self._stats = {"admitted": 0, "rejected": 0, "slow": 0, "decreases": 0}
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self._stats["rejected"] += 1
+            return False
+        self.in_flight += 1
+        self._stats["admitted"] += 1
+        return True
+
+    def release(self, latency_s: float, overloaded: bool) -> None:
+        """Feed back one finished request: slow or overloaded → decrease, else grow."""
+        in_use = self.in_flight
+        self.in_flight -= 1
+        self.latency_s = latency_s if self.latency_s == 0 else 0.9 * self.latency_s + 0.1 * latency_s
+
+        if overloaded or latency_s > self.target_s:
+            self._stats["slow"] += 1
+            # One cut per latency window: a burst of slow responses is one signal
+            now = time.monotonic()
+            if now - self._last_decrease >= max(self.latency_s, self.target_s):
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                self._stats["decreases"] += 1
+        elif in_use * 2 >= self.limit:
+            # Only grow a limit that is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.latency_s))
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency_s * 1000, 1),
+            "target_ms": round(self.target_s * 1000, 1),
+        }
+
+
+class AdmissionController:
+    """Shared admission state: per-group adaptive limits and priority caps."""
+
+    def __init__(
+        self,
+        route_limits: dict[str, int],
+        latency_targets_ms: dict[str, float],
+        max_in_flight: int,
+        inference_share: float,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.limits = {
+            group: AdaptiveLimit(route_limits.get(group, max_in_flight), latency_targets_ms.get(group, 1000.0))
+            for _, group, priority in ROUTES
+            if priority != "critical"
+        }
+        # Highest total in-flight at which each priority is still admitted
+        self.caps = {
+            "interactive": max_in_flight,
+            "inference": max(1, int(max_in_flight * inference_share)),
+        }
+        self.in_flight = 0
+        self.shed = {"inference": 0, "interactive": 0}
+
+    def stats(self) -> dict:
+        return {
+            **{group: limit.stats() for group, limit in self.limits.items()},
+            "total": {
+                "enabled": self.enabled,
+                "in_flight": self.in_flight,
+                **{f"{priority}_cap": cap for priority, cap in self.caps.items()},
+                **{f"{priority}_shed": count for priority, count in self.shed.items()},
+            },
+        }
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying an AdmissionController to every request."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = self.controller
+        route = route_for(scope["path"]) if scope["type"] == "http" and controller.enabled else None
+        if route is None or route[1] == "critical":
+            await self.app(scope, receive, send)
+            return
+
+        group, priority = route
+        if controller.in_flight >= controller.caps[priority]:
+            controller.shed[priority] += 1
+            await _reject(send, 503, "The server is overloaded, please retry shortly.", 1)
+            return
+        limit = controller.limits[group]
+        if not limit.try_acquire():
+            await _reject(send, 429, "Too many concurrent requests for this endpoint, please retry shortly.",
+                          limit.retry_after())
+            return
+
+        controller.in_flight += 1
+        start = time.perf_counter()
+        latency = None
+        status = 500
+
+        async def timed_receive() -> Message:
+            nonlocal start
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                start = time.perf_counter()  # body fully received: server time starts here
+            return message
+
+        async def timed_send(message: Message) -> None:
+            nonlocal latency, status
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, timed_receive, timed_send)
+        finally:
+            controller.in_flight -= 1
+            if latency is None:
+                latency = time.perf_counter() - start
+            limit.release(latency, overloaded=status in (503, 504))
+
+
+async def _reject(send: Send, status: int, detail: str, retry_after: int) -> None:
+    body = f'{{"detail":"{detail}"}}'.encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,156 @@
+"""
+FarmEase Backend — Disease Inference Backends
+─────────────────────────────────────────────
+Interchangeable runtimes for the disease CNN, selected with DISEASE_BACKEND:
+
+  • keras   — the original `.h5` model on full TensorFlow
+  • tflite  — float16 / int8 TFLite export; uses `tflite-runtime` when
+              installed, so the image doesn't need TensorFlow at all
+  • onnx    — ONNX export on onnxruntime's CPU provider
+
+Every backend exposes `predict(batch) -> probs` for a float32
+(N, 224, 224, 3) batch scaled to [0, 1]. Exports are produced by
+`python -m scripts.convert_disease_model` and checked against Keras with
+`python -m benchmarks.bench_disease_backends`.
+"""
+
+import threading
+from pathlib import Path
+from typing import Optional, Protocol
+
+import numpy as np
+
+from app.ingest import decode_rgb, resize_uint8
+
+
+class DiseaseBackend(Protocol):
+    name: str
+
+    def predict(self, batch: np.ndarray) -> np.ndarray: ...
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path: Path, threads: int = 0):
+        import tensorflow as tf
+
+        if threads:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+        self.model = tf.keras.models.load_model(str(path))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch, batch_size=len(batch), verbose=0)
+
+
+def _tflite_interpreter_class():
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteBackend:
+    """TFLite interpreter; int8 inputs/outputs are (de)quantized transparently."""
+
+    name = "tflite"
+
+    def __init__(self, path: Path, threads: int = 0):
+        Interpreter = _tflite_interpreter_class()
+        self._interpreter = Interpreter(model_path=str(path), num_threads=threads or None)
+        self._interpreter.allocate_tensors()
+        self._batch_size: Optional[int] = None
+        # An interpreter is not re-entrant; warm-up and batches must not overlap
+        self._lock = threading.Lock()
+
+    def _prepare(self, batch_size: int) -> None:
+        """Resize the input tensor when the batch size changes."""
+        if batch_size == self._batch_size:
+            return
+        index = self._interpreter.get_input_details()[0]["index"]
+        shape = self._interpreter.get_input_details()[0]["shape"]
+        self._interpreter.resize_tensor_input(index, [batch_size, *shape[1:]])
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._prepare(len(batch))
+            self._interpreter.set_tensor(self._input["index"], _quantize(batch, self._input))
+            self._interpreter.invoke()
+            # get_tensor returns a copy, safe to hand out after the lock is released
+            return _dequantize(self._interpreter.get_tensor(self._output["index"]), self._output)
+
+
+def _quantize(x: np.ndarray, detail: dict) -> np.ndarray:
+    dtype = detail["dtype"]
+    if not np.issubdtype(dtype, np.integer):
+        return x.astype(dtype, copy=False)
+    scale, zero_point = detail["quantization"]
+    info = np.iinfo(dtype)
+    return np.clip(np.round(x / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def _dequantize(y: np.ndarray, detail: dict) -> np.ndarray:
+    if not np.issubdtype(detail["dtype"], np.integer):
+        return y
+    scale, zero_point = detail["quantization"]
+    return (y.astype(np.float32) - zero_point) * scale
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path: Path, threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self._input = self._session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input: np.ascontiguousarray(batch, dtype=np.float32)})[0]
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def load_backend(kind: str, path: Path, threads: int = 0) -> DiseaseBackend:
+    try:
+        backend = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown disease backend {kind!r} (expected one of {', '.join(BACKENDS)})")
+    return backend(path, threads)
+
+
+def sample_images(directory: Optional[Path], limit: int = 64, size: tuple[int, int] = (224, 224), seed: int = 0) -> np.ndarray:
+    """
+    Up to `limit` images from `directory` (recursively), preprocessed exactly
+    like uploads → float32 (N, h, w, 3). Random pixels when no directory is
+    given — fine for latency, not meaningful for accuracy parity.
+    """
+    if directory is None:
+        rng = np.random.default_rng(seed)
+        return rng.random((limit, *size, 3), dtype=np.float32)
+
+    paths = sorted(
+        p for p in Path(directory).rglob("*")
+        if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+    )[:limit]
+    if not paths:
+        raise FileNotFoundError(f"No images found under {directory}")
+    return np.stack([
+        resize_uint8(decode_rgb(p.read_bytes(), size), size).astype(np.float32) / 255.0
+        for p in paths
+    ])
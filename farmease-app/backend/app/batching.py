@@ -0,0 +1,147 @@
+"""
+FarmEase Backend — Micro-batching Scheduler
+───────────────────────────────────────────
+Collects concurrent inference requests into a single batch so the model
+runs one forward pass per batch instead of one per request. A batch is
+dispatched as soon as it is full or the oldest request has waited
+`max_wait_ms`, whichever comes first. Batches run on the shared
+inference executor, never on the event loop itself.
+"""
+
+import asyncio
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from app.executor import InferenceQueueFull, get_executor
+
+
+class MicroBatcher:
+    """Groups single-sample `submit()` calls into batched `predict_fn` calls."""
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_queue: int = 256,
+        collate: Callable[[Sequence[np.ndarray]], np.ndarray] = np.stack,
+    ):
+        self.predict_fn = predict_fn
+        # Builds the batch array from the queued samples (on the executor)
+        self.collate = collate
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue = max(1, max_queue)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    # ── Public API ────────────────────────────────────────────
+    async def submit(self, sample: np.ndarray) -> np.ndarray:
+        """Queue one sample and wait for its row of the batched output."""
+        self._ensure_worker()
+        if self._queue.qsize() >= self.max_queue:
+            raise InferenceQueueFull("batch")
+        future = self._loop.create_future()
+        await self._queue.put((sample, future))
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    async def stop(self) -> None:
+        """Cancel the dispatch loop (pending requests are failed)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher stopped"))
+        self._worker = None
+        self._queue = None
+        self._loop = None
+
+    # ── Internals ─────────────────────────────────────────────
+    def _ensure_worker(self) -> None:
+        """Start (or re-bind) the dispatch loop on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._dispatch_loop())
+
+    async def _collect_batch(self) -> list[tuple[np.ndarray, asyncio.Future]]:
+        """Block for the first request, then gather more until full or timed out."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already waiting without yielding
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            # asyncio.wait (not wait_for) so a timed-out get never swallows an item
+            getter = asyncio.ensure_future(self._queue.get())
+            try:
+                done, _ = await asyncio.wait({getter}, timeout=remaining)
+            except asyncio.CancelledError:
+                getter.cancel()
+                _fail(batch)  # already dequeued, so stop() can't see them
+                raise
+            if getter not in done:
+                getter.cancel()
+                break
+            batch.append(getter.result())
+
+        # Clients that disconnected while queued don't need a prediction
+        return [(sample, future) for sample, future in batch if not future.done()]
+
+    def _predict(self, samples: list[np.ndarray]):
+        return self.predict_fn(self.collate(samples))
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+
+            samples = [sample for sample, _ in batch]
+            try:
+                # One batch in flight at a time; the next one fills meanwhile
+                outputs = await get_executor().run(self._predict, samples)
+            except asyncio.CancelledError:
+                # stop() only fails what is still queued; this batch is ours
+                _fail(batch)
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+
+def _fail(batch: list[tuple[np.ndarray, asyncio.Future]]) -> None:
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(RuntimeError("Batcher stopped"))
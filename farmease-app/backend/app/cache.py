@@ -0,0 +1,165 @@
+"""
+FarmEase Backend — In-process TTL Cache
+───────────────────────────────────────
+Async-aware LRU cache used in front of slow or rate-limited upstreams.
+
+  • per-entry TTL, plus an optional stale window during which the old
+    value is served immediately while a background refresh runs
+  • LRU eviction bounded by an approximate memory budget
+  • request coalescing — concurrent misses for one key share one fetch
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+def json_size(value: Any) -> int:
+    """Approximate footprint of a JSON-like value: its serialized length."""
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+
+
+class TTLCache:
+    """LRU + TTL cache with stale-while-revalidate and coalesced fetches."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = json_size,
+        max_entries: Optional[int] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.sizeof = sizeof
+
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refresh_errors": 0,
+        }
+
+    # ── Synchronous primitives ────────────────────────────────
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        limit = entry.stale_until if allow_stale else entry.fresh_until
+        if now >= limit:
+            if now >= entry.stale_until:
+                self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return  # would evict everything else; not worth caching
+        self.delete(key)
+        now = time.monotonic()
+        self._entries[key] = _Entry(value, size, now + ttl, now + ttl + stale_ttl)
+        self._bytes += size
+        self._evict()
+
+    def delete(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            self._bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats["evictions"] += 1
+
+    # ── Async read-through ────────────────────────────────────
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0.0,
+    ) -> Any:
+        """Return the cached value, refreshing or fetching it as needed."""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None and now < entry.fresh_until:
+            self._stats["hits"] += 1
+            self._entries.move_to_end(key)
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            # Serve stale now; refresh once in the background
+            self._stats["stale_hits"] += 1
+            self._entries.move_to_end(key)
+            if key not in self._inflight:
+                self._start_fetch(key, fetch, ttl, stale_ttl).add_done_callback(self._log_refresh_error)
+            return entry.value
+
+        self._stats["misses"] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._start_fetch(key, fetch, ttl, stale_ttl)
+        else:
+            self._stats["coalesced"] += 1
+        # shield: one caller disconnecting must not cancel everyone's fetch
+        return await asyncio.shield(future)
+
+    def _start_fetch(self, key, fetch, ttl: float, stale_ttl: float) -> asyncio.Future:
+        async def load():
+            value = await fetch()
+            self.set(key, value, ttl, stale_ttl)
+            return value
+
+        future = asyncio.ensure_future(load())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    def _log_refresh_error(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            self._stats["refresh_errors"] += 1
+
+    # ── Introspection ─────────────────────────────────────────
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round((self._stats["hits"] + self._stats["stale_hits"]) / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+        }
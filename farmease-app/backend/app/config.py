@@ -6,6 +6,7 @@ Loads environment variables with sensible defaults.
 import os
 from pathlib import Path
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,9 +27,50 @@ class Settings(BaseSettings):
     supabase_url: str = "https://your-project.supabase.co"
     supabase_service_key: str = "your-service-role-key"
 
+    # Async PostgREST access (app/db.py): per-query budget + connection pool
+    db_timeout_s: float = 5.0
+    db_max_connections: int = 20
+    db_max_keepalive: int = 10
+    db_slow_query_ms: float = 500.0
+
+    # Marketplace read-through cache (app/query_cache.py). Writes invalidate
+    # it; with several workers set a Redis URL so they share invalidations,
+    # otherwise other workers' copies live until their TTL.
+    marketplace_cache_enabled: bool = True
+    marketplace_cache_listing_ttl_s: float = 30.0
+    marketplace_cache_product_ttl_s: float = 120.0
+    marketplace_cache_max_mb: float = 16.0
+    marketplace_cache_redis_url: str = ""
+    # Largest accepted bulk create / update submission
+    marketplace_bulk_max_items: int = 500
+    # A database function found missing (search_products(), nearby_products())
+    # is probed again after this long, so deploying it needs no restart
+    marketplace_rpc_retry_s: float = 300.0
+    # "Near me" queries: PostGIS (nearby_products() in supabase_schema.sql)
+    # or an in-process geohash index of every located product, reloaded
+    # every N seconds (used automatically if the function isn't deployed)
+    marketplace_geo_backend: Literal["postgis", "local"] = "postgis"
+    marketplace_geo_index_refresh_s: float = 300.0
+
     # ── OpenWeatherMap ────────────────────────────────────────
     openweather_api_key: str = "your-openweathermap-api-key"
 
+    # Weather cache: ~5 km grid cells, stale responses served while refreshing
+    weather_cache_grid_deg: float = 0.05
+    weather_cache_ttl_s: float = 600.0
+    forecast_cache_ttl_s: float = 1800.0
+    weather_cache_stale_s: float = 600.0
+    weather_cache_max_mb: float = 32.0
+
+    # ── Outbound HTTP (shared, pooled client) ─────────────────
+    http_http2: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    http_keepalive_expiry_s: float = 30.0
+    http_timeout_s: float = 10.0
+    http_connect_timeout_s: float = 5.0
+    http_pool_timeout_s: float = 5.0
+
     # ── Server ────────────────────────────────────────────────
     host: str = "0.0.0.0"
     port: int = 8000
@@ -39,6 +81,113 @@ class Settings(BaseSettings):
     crop_model_path: str = "models/crop_model.pkl"
     fertilizer_model_path: str = "models/fertilizer_model.pkl"
 
+    # Disease CNN runtime; tflite / onnx load the converted exports below
+    disease_backend: Literal["keras", "tflite", "onnx"] = "keras"
+    disease_tflite_model_path: str = "models/disease_model.tflite"
+    disease_onnx_model_path: str = "models/disease_model.onnx"
+    # Intra-op threads for the disease runtime (0 = runtime default)
+    disease_backend_threads: int = 0
+
+    # Serve the crop forest from flat NumPy arrays (batches up to N rows)
+    crop_compiled_predictor: bool = False
+    crop_compiled_max_rows: int = 128
+
+    # Load + warm every model at startup instead of on first request
+    eager_model_loading: bool = True
+    # Hot reload: poll model files every N seconds (0 disables); keep N old versions
+    registry_watch_interval_s: float = 5.0
+    registry_keep_versions: int = 2
+    # POST /models/{name}/reload|rollback need this in X-Admin-Token;
+    # empty (the default) disables them
+    models_admin_token: str = ""
+    # Multi-worker mode: models the gunicorn master loads before forking.
+    # Only fork-safe ones (NumPy / scikit-learn) — TensorFlow and
+    # onnxruntime start thread pools that don't survive fork().
+    fork_preload_models: list[str] = ["crop", "fertilizer"]
+
+    # ── Batch inference ───────────────────────────────────────
+    disease_batch_max_size: int = 16
+    disease_batch_max_wait_ms: float = 10.0
+    # Largest accepted /predict/crop/batch submission
+    crop_batch_max_rows: int = 10000
+    # Largest accepted /predict/crop/batch body (rejected while streaming,
+    # before any row is parsed); ~100 bytes per CSV row, ~200 per JSON row
+    crop_batch_max_mb: float = 4.0
+
+    # Largest accepted /predict/disease request body (rejected while streaming)
+    disease_upload_max_mb: float = 10.0
+
+    # ── Disease job queue (POST /predict/disease/jobs) ────────
+    # Workers diagnose concurrently so their images share micro-batches.
+    # Each queued job holds its upload (up to DISEASE_UPLOAD_MAX_MB) in
+    # memory; finished results are kept for the TTL or until evicted.
+    disease_jobs_workers: int = 16
+    disease_jobs_max_queue: int = 64
+    disease_jobs_ttl_s: float = 600.0
+    disease_jobs_max_stored: int = 10000
+    # Longest a GET /predict/disease/jobs/{id}?wait= long-poll may block
+    disease_jobs_max_wait_s: float = 30.0
+
+    # ── Disease result cache ──────────────────────────────────
+    # Repeat uploads are answered from memory; dHash near-duplicate
+    # matching is enabled when the distance is > 0 (bits out of 64)
+    disease_cache_max_mb: float = 16.0
+    disease_cache_ttl_s: float = 86400.0
+    disease_cache_phash_distance: int = 0
+    disease_cache_phash_entries: int = 4096
+
+    # ── Inference executor ────────────────────────────────────
+    # Process workers = 0 keeps everything on the thread pool
+    inference_thread_workers: int = 4
+    inference_process_workers: int = 0
+    inference_max_queue: int = 64
+
+    # ── Admission control ─────────────────────────────────────
+    # Concurrent requests per route group (429 past it); each group's
+    # limit shrinks while its latency is above the target and recovers
+    # after. Inference routes may use this share of the global cap (503 past it).
+    admission_enabled: bool = True
+    admission_max_in_flight: int = 256
+    admission_inference_share: float = 0.75
+    admission_route_limits: dict[str, int] = {
+        "disease": 32, "crop": 64, "crop_batch": 16, "fertilizer": 64, "weather": 128, "marketplace": 128,
+    }
+    admission_latency_targets_ms: dict[str, float] = {
+        "disease": 1500, "crop": 500, "crop_batch": 5000, "fertilizer": 500, "weather": 1000, "marketplace": 250,
+    }
+
+    # ── Rate limiting ─────────────────────────────────────────
+    # Token bucket per client and route group: requests per minute and
+    # burst. Clients are X-API-Key, else X-User-Id, else IP; header-
+    # identified clients also share a per-IP bucket this many times larger.
+    rate_limit_enabled: bool = True
+    rate_limit_per_minute: dict[str, float] = {
+        "disease": 30, "disease_jobs": 120, "crop": 120, "crop_batch": 10, "fertilizer": 120,
+        "weather": 60, "marketplace": 600,
+    }
+    rate_limit_burst: dict[str, float] = {
+        "disease": 10, "disease_jobs": 30, "crop": 30, "crop_batch": 3, "fertilizer": 30,
+        "weather": 20, "marketplace": 100,
+    }
+    rate_limit_ip_multiplier: float = 10.0
+    # Only behind a proxy that sets X-Forwarded-For itself
+    rate_limit_trust_forwarded_for: bool = False
+    # Shared buckets across workers (needs redis-py); empty = per worker
+    rate_limit_redis_url: str = ""
+    rate_limit_max_keys: int = 100000
+
+    # ── Prediction logging (write-behind to Supabase) ────────
+    # Only requests that carry a user_id are logged (the tables require one)
+    prediction_log_enabled: bool = True
+    prediction_log_batch_rows: int = 200
+    prediction_log_flush_interval_s: float = 2.0
+    prediction_log_max_buffer: int = 10000
+    # Failed batches wait here (relative to backend/) until the database is back
+    prediction_log_spool_dir: str = "spool/predictions"
+    prediction_log_spool_max_mb: float = 64.0
+    # A spool file claimed by a worker that died is replayed again after this
+    prediction_log_claim_ttl_s: float = 300.0
+
     # ── CORS ──────────────────────────────────────────────────
     allowed_origins: list[str] = ["*"]
 
@@ -46,6 +195,19 @@ class Settings(BaseSettings):
     def disease_model_abs(self) -> Path:
         return BASE_DIR / self.disease_model_path
 
+    @property
+    def disease_backend_model_abs(self) -> Path:
+        """Model file for the selected disease backend."""
+        return BASE_DIR / {
+            "keras": self.disease_model_path,
+            "tflite": self.disease_tflite_model_path,
+            "onnx": self.disease_onnx_model_path,
+        }[self.disease_backend]
+
+    @property
+    def prediction_log_spool_abs(self) -> Path:
+        return BASE_DIR.parent / self.prediction_log_spool_dir
+
     @property
     def crop_model_abs(self) -> Path:
         return BASE_DIR / self.crop_model_path
@@ -0,0 +1,136 @@
+"""
+FarmEase Backend — Async Database Access
+────────────────────────────────────────
+Non-blocking access to Supabase's PostgREST API for request handlers.
+The `supabase` client's `.execute()` is synchronous and stalls the event
+loop for a full database round trip; this module uses postgrest's async
+client on one pooled `httpx.AsyncClient` instead.
+
+    rows = await db.execute(db.table("products").select("*").eq("id", pid), "products.get")
+
+Every query is named, timed and bounded by DB_TIMEOUT_S; a timeout raises
+`QueryTimeout`, which the app turns into a 504. Per-query latency is
+reported under /stats.
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient
+
+from app import metrics
+from app.config import get_settings
+
+_client: Optional[AsyncPostgrestClient] = None
+
+_stats: dict[str, dict] = {}
+
+
+class QueryTimeout(Exception):
+    """Raised when a database query exceeds its time budget."""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"Query {name!r} timed out after {timeout:g}s")
+        self.name = name
+        self.timeout = timeout
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """postgrest's async client with explicit connection-pool limits."""
+
+    def create_session(self, base_url, headers, timeout) -> httpx.AsyncClient:
+        settings = get_settings()
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=settings.db_max_connections,
+                max_keepalive_connections=settings.db_max_keepalive,
+            ),
+        )
+
+
+def _create_client() -> AsyncPostgrestClient:
+    settings = get_settings()
+    key = settings.supabase_service_key
+    return _PooledPostgrestClient(
+        f"{settings.supabase_url.rstrip('/')}/rest/v1",
+        headers={
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        },
+        # Transport-level ceiling; execute() applies the per-query budget
+        timeout=settings.db_timeout_s + 1,
+    )
+
+
+# ── Lifecycle ─────────────────────────────────────────────────
+async def startup() -> None:
+    global _client
+    if _client is None:
+        _client = _create_client()
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_db() -> AsyncPostgrestClient:
+    """The shared async PostgREST client (created on demand outside the lifespan)."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+def table(name: str):
+    """Start a query builder on `name` (await it with `execute`)."""
+    return get_db().table(name)
+
+
+# ── Queries ───────────────────────────────────────────────────
+async def execute(query: Any, name: str, timeout: Optional[float] = None) -> Any:
+    """Run a postgrest query builder with a timeout, recording its latency under `name`."""
+    settings = get_settings()
+    timeout = settings.db_timeout_s if timeout is None else timeout
+    stats = _stats.setdefault(name, {"count": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(query.execute(), timeout)
+    except asyncio.TimeoutError:
+        stats["timeouts"] += 1
+        raise QueryTimeout(name, timeout)
+    except Exception:
+        stats["errors"] += 1
+        raise
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stats["count"] += 1
+        stats["total_ms"] += elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+        metrics.observe_span("db", name, elapsed / 1000)
+        if elapsed > settings.db_slow_query_ms:
+            print(f"⚠️  Slow query {name}: {elapsed:.0f} ms")
+
+
+def query_stats() -> dict:
+    """Per-query count, failures and latency."""
+    return {
+        name: {
+            "count": s["count"],
+            "errors": s["errors"],
+            "timeouts": s["timeouts"],
+            "avg_ms": round(s["total_ms"] / s["count"], 2) if s["count"] else 0.0,
+            "max_ms": round(s["max_ms"], 2),
+        }
+        for name, s in _stats.items()
+    }
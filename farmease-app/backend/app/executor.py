@@ -0,0 +1,110 @@
+"""
+FarmEase Backend — Inference Executor
+─────────────────────────────────────
+Shared worker pools that keep blocking model work off the asyncio loop.
+
+  • thread pool  — model inference (TensorFlow and sklearn's tree
+                   traversal release the GIL; models stay in the registry)
+  • process pool — stateless CPU-bound Python work (PIL decoding)
+
+Each pool has a bounded number of pending jobs; once it is full, callers
+get `InferenceQueueFull`, which the app turns into a 503 with Retry-After.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Literal, Optional
+
+from app.config import get_settings
+
+PoolKind = Literal["thread", "process"]
+
+
+class InferenceQueueFull(Exception):
+    """Raised when an inference pool already has its maximum pending jobs."""
+
+    def __init__(self, pool: str, retry_after: int = 1):
+        super().__init__(f"{pool} inference queue is full")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Bounded thread + process pools shared by all prediction routers."""
+
+    def __init__(self, thread_workers: int, process_workers: int, max_queue: int):
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = max(0, process_workers)
+        self.max_queue = max(1, max_queue)
+
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        # Only touched from the event loop thread, so plain ints are safe
+        self._pending: dict[str, int] = {"thread": 0, "process": 0}
+
+    # ── Pools (created on first use) ──────────────────────────
+    def _pool(self, kind: PoolKind) -> tuple[str, Executor]:
+        if kind == "process" and self.process_workers > 0:
+            if self._processes is None:
+                # spawn, not fork: forking a process that has TensorFlow's
+                # thread pools running can deadlock the child
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return "process", self._processes
+
+        # No process workers configured → everything runs on threads
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.thread_workers,
+                thread_name_prefix="inference",
+            )
+        return "thread", self._threads
+
+    # ── Public API ────────────────────────────────────────────
+    async def run(self, fn: Callable[..., Any], *args: Any, kind: PoolKind = "thread") -> Any:
+        """Run `fn(*args)` on the requested pool and await its result.
+
+        For kind="process", `fn` and its arguments must be picklable
+        (i.e. module-level functions taking plain data).
+        """
+        name, pool = self._pool(kind)
+        if self._pending[name] >= self.max_queue:
+            raise InferenceQueueFull(name)
+
+        self._pending[name] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, partial(fn, *args))
+        finally:
+            self._pending[name] -= 1
+
+    def stats(self) -> dict:
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "max_queue": self.max_queue,
+            "pending": dict(self._pending),
+        }
+
+    def shutdown(self) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+
+@lru_cache()
+def get_executor() -> InferenceExecutor:
+    """Cached executor singleton shared by every router."""
+    settings = get_settings()
+    return InferenceExecutor(
+        thread_workers=settings.inference_thread_workers,
+        process_workers=settings.inference_process_workers,
+        max_queue=settings.inference_max_queue,
+    )
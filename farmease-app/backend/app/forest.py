@@ -0,0 +1,140 @@
+"""
+FarmEase Backend — Compiled Forest Predictor
+────────────────────────────────────────────
+Flattens a fitted scikit-learn forest classifier into contiguous NumPy
+arrays (one global node table for all trees) and evaluates it with a
+vectorized traversal: every (row, tree) pair still at a split node steps
+one level down per iteration. This skips sklearn's per-call input
+validation and joblib dispatch, which dominate latency for the small
+batches the API sends.
+
+Matches `RandomForestClassifier.predict_proba` exactly: inputs are cast
+to float32 and per-tree probabilities summed in order, as sklearn does.
+Large batches are handed back to sklearn's Cython traversal, which wins
+once per-call overhead is amortized (crossover ≈ 200 rows × 100 trees).
+"""
+
+import numpy as np
+
+# Bound the (rows × trees × classes) gather to roughly this many floats per chunk
+_CHUNK_ELEMENTS = 1 << 22
+
+
+class CompiledForest:
+    """Array-backed, predict-only copy of a fitted forest classifier."""
+
+    def __init__(self, forest, max_rows: int = 128):
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output forest classifiers can be compiled")
+
+        trees = [est.tree_ for est in forest.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        features, thresholds, children, values, leaves = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            is_leaf = tree.children_left < 0
+            own = np.arange(tree.node_count) + offset
+            left = np.where(is_leaf, own, tree.children_left + offset)
+            right = np.where(is_leaf, own, tree.children_right + offset)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.stack([left, right], axis=1))
+            leaves.append(is_leaf)
+
+            # sklearn ≥ 1.4 stores class fractions and uses them as-is; older
+            # releases store counts and normalize at predict time
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            totals[(totals == 0) | np.isclose(totals, 1.0, rtol=0, atol=1e-12)] = 1.0
+            values.append(value / totals)
+
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64)
+        self.children = np.ascontiguousarray(np.concatenate(children), dtype=np.intp)
+        self.value = np.ascontiguousarray(np.concatenate(values))
+        self.is_leaf = np.concatenate(leaves)
+        self.roots = offsets.astype(np.intp)
+
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        # Batches bigger than this go to the original forest
+        self.max_rows = max_rows
+        self.forest = forest
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf index reached by every (row, tree) pair: shape (rows, trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_trees = len(X), self.n_estimators
+
+        node = np.tile(self.roots, n_rows)
+        # Offset of each pair's input row in the flattened X
+        row_base = np.repeat(np.arange(n_rows) * X.shape[1], n_trees)
+        flat_x = X.ravel()
+
+        # Step only the pairs still at a split node; most paths end well above max depth
+        active = np.flatnonzero(~self.is_leaf[node])
+        while active.size:
+            at = node[active]
+            go_right = flat_x[row_base[active] + self.feature[at]] > self.threshold[at]
+            at = self.children[at, go_right.view(np.uint8)]
+            node[active] = at
+            active = active[~self.is_leaf[at]]
+        return node.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) > self.max_rows:
+            return self.forest.predict_proba(X)
+        return self.predict_proba_compiled(X)
+
+    def predict_proba_compiled(self, X: np.ndarray) -> np.ndarray:
+        """Compiled traversal for any batch size (chunked to bound memory)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n, {self.n_features_in_}), got {X.shape}")
+
+        n_classes = self.value.shape[1]
+        chunk = max(1, _CHUNK_ELEMENTS // (self.n_estimators * n_classes))
+        proba = np.empty((len(X), n_classes))
+        for start in range(0, len(X), chunk):
+            leaves = self.apply(X[start:start + chunk])
+            # Sum tree by tree, then divide, in sklearn's order: bit-identical results
+            acc = np.zeros((len(leaves), n_classes))
+            for t in range(self.n_estimators):
+                acc += self.value[leaves[:, t]]
+            proba[start:start + chunk] = acc / self.n_estimators
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def sample_inputs(compiled: CompiledForest, n: int = 512, seed: int = 0) -> np.ndarray:
+    """Random rows spanning every split threshold — used for parity checks."""
+    rng = np.random.default_rng(seed)
+    columns = []
+    for f in range(compiled.n_features_in_):
+        splits = compiled.threshold[~compiled.is_leaf & (compiled.feature == f)]
+        lo, hi = (splits.min() - 1.0, splits.max() + 1.0) if len(splits) else (0.0, 1.0)
+        columns.append(rng.uniform(lo, hi, n))
+    return np.column_stack(columns)
+
+
+def compile_forest(forest, max_rows: int = 128, check_rows: int = 512, atol: float = 1e-9):
+    """Compile `forest` and verify it against sklearn; returns the original on mismatch."""
+    try:
+        compiled = CompiledForest(forest, max_rows=max_rows)
+    except Exception as e:
+        print(f"⚠️  Could not compile forest, using scikit-learn predictor: {e}")
+        return forest
+
+    X = sample_inputs(compiled, check_rows)
+    if not np.allclose(compiled.predict_proba_compiled(X), forest.predict_proba(X), atol=atol):
+        print("⚠️  Compiled forest disagrees with scikit-learn, using scikit-learn predictor")
+        return forest
+    return compiled
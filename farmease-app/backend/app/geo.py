@@ -0,0 +1,153 @@
+"""
+FarmEase Backend — Geospatial Helpers
+─────────────────────────────────────
+Distance maths and an in-process spatial index for "near me" product
+queries when PostGIS isn't available (MARKETPLACE_GEO_BACKEND=local).
+
+Points are bucketed into geohash cells: at precision p the world is split
+into 2^⌈5p/2⌉ longitude × 2^⌊5p/2⌋ latitude cells, and a cell's
+(lat index, lon index) pair is exactly its geohash with the bits
+de-interleaved. A query visits rings of cells outward from the origin
+and stops as soon as no unvisited cell can hold anything closer than the
+k-th match (or the radius). When the search spreads over many cells — an
+origin far from every point — one vectorized pass over all points is
+cheaper.
+"""
+
+import heapq
+import math
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+_KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+Match = tuple[float, Hashable, Any]  # (distance km, key, data)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeohashIndex:
+    """Points bucketed by geohash cell, for radius and nearest-first queries."""
+
+    def __init__(self, precision: int = 5):
+        bits = 5 * precision
+        self._n_lat = 2 ** (bits // 2)
+        self._n_lon = 2 ** ((bits + 1) // 2)
+        self._cell_lat = 180.0 / self._n_lat
+        self._cell_lon = 360.0 / self._n_lon
+        self._cells: dict[tuple[int, int], dict[Hashable, tuple[float, float, Any]]] = {}
+        self._where: dict[Hashable, tuple[int, int]] = {}
+        self._flat = None
+
+    # ── Maintenance ───────────────────────────────────────────
+    def add(self, key: Hashable, lat: float, lon: float, data: Any = None) -> None:
+        self.remove(key)
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[key] = (lat, lon, data)
+        self._where[key] = cell
+        self._flat = None
+
+    def remove(self, key: Hashable) -> None:
+        cell = self._where.pop(key, None)
+        if cell is not None:
+            points = self._cells[cell]
+            del points[key]
+            if not points:
+                del self._cells[cell]
+            self._flat = None
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        i = min(int((lat + 90.0) / self._cell_lat), self._n_lat - 1)
+        j = int((lon + 180.0) / self._cell_lon) % self._n_lon
+        return i, j
+
+    # ── Queries ───────────────────────────────────────────────
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        radius_km: Optional[float] = None,
+        where: Optional[Callable[[Any], bool]] = None,
+    ) -> list[Match]:
+        """Up to `k` points closest to (lat, lon), nearest first, optionally within `radius_km`."""
+        if k <= 0 or not self._cells:
+            return []
+        limit = math.inf if radius_km is None else radius_km
+        ci, cj = self._cell(lat, lon)
+        best: list[Match] = []
+        visited, ring = 0, 0
+        while True:
+            cells = self._ring_cells(ci, cj, ring)
+            visited += len(cells)
+            # A cell visit costs about as much as ~16 points in the vectorized pass
+            if visited > len(self._where) // 16 + 256:
+                return self._scan_all(lat, lon, k, limit, where)
+            for cell in cells:
+                for key, (plat, plon, data) in self._cells.get(cell, {}).items():
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if distance <= limit and (where is None or where(data)):
+                        best.append((distance, key, data))
+            best = heapq.nsmallest(k, best, key=lambda m: m[0])
+            # Anything in ring r+1 is at least r whole cells away
+            bound = best[-1][0] if len(best) == k else limit
+            if bound <= ring * self._min_cell_km(lat, ring + 1):
+                return best
+            ring += 1
+
+    def _scan_all(self, lat: float, lon: float, k: int, limit: float, where) -> list[Match]:
+        keys, data, lats, lons = self._arrays()
+        phi = math.radians(lat)
+        a = (
+            np.sin((lats - phi) / 2) ** 2
+            + math.cos(phi) * np.cos(lats) * np.sin((lons - math.radians(lon)) / 2) ** 2
+        )
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        candidates = np.flatnonzero(distances <= limit)
+        matches: list[Match] = []
+        for i in candidates[np.argsort(distances[candidates])]:
+            if len(matches) == k:
+                break
+            if where is None or where(data[i]):
+                matches.append((float(distances[i]), keys[i], data[i]))
+        return matches
+
+    def _arrays(self):
+        """All points as flat arrays (radians), rebuilt after any change."""
+        if self._flat is None:
+            points = [(key, *point) for cell in self._cells.values() for key, point in cell.items()]
+            self._flat = (
+                [p[0] for p in points],
+                [p[3] for p in points],
+                np.radians(np.array([p[1] for p in points], dtype=np.float64)),
+                np.radians(np.array([p[2] for p in points], dtype=np.float64)),
+            )
+        return self._flat
+
+    def _ring_cells(self, ci: int, cj: int, ring: int) -> set[tuple[int, int]]:
+        if ring == 0:
+            return {(ci, cj)}
+        cells = set()
+        for d in range(-ring, ring + 1):
+            for i, j in ((ci - ring, cj + d), (ci + ring, cj + d), (ci + d, cj - ring), (ci + d, cj + ring)):
+                if 0 <= i < self._n_lat:
+                    cells.add((i, j % self._n_lon))
+        return cells
+
+    def _min_cell_km(self, lat: float, ring: int) -> float:
+        """Smallest cell side (km) within `ring` cells of `lat` — cells narrow towards the poles."""
+        far_lat = min(90.0, abs(lat) + ring * self._cell_lat)
+        width = self._cell_lon * _KM_PER_DEG_LAT * math.cos(math.radians(far_lat))
+        return max(0.0, min(self._cell_lat * _KM_PER_DEG_LAT, width))
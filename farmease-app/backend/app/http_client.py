@@ -0,0 +1,127 @@
+"""
+FarmEase Backend — Shared HTTP Client
+─────────────────────────────────────
+One application-scoped `httpx.AsyncClient` for outbound calls (currently
+the OpenWeatherMap proxy). Reusing it keeps TCP/TLS connections — and
+HTTP/2 sessions when `h2` is installed — alive across requests instead of
+paying DNS + handshakes on every call. Opened and closed by the app
+lifespan; also reports pool utilization for /stats.
+"""
+
+import time
+from typing import Any, Optional
+
+import httpx
+
+from app import metrics
+from app.config import get_settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+_stats = {
+    "requests": 0,
+    "errors": 0,
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "total_ms": 0.0,
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    http2 = settings.http_http2 and _http2_available()
+    if settings.http_http2 and not http2:
+        print("⚠️  HTTP/2 requested but the 'h2' package is missing — using HTTP/1.1 keep-alive")
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry_s,
+        ),
+        timeout=httpx.Timeout(
+            settings.http_timeout_s,
+            connect=settings.http_connect_timeout_s,
+            pool=settings.http_pool_timeout_s,
+        ),
+    )
+
+
+# ── Lifecycle ─────────────────────────────────────────────────
+async def startup() -> None:
+    global _client
+    if _client is None:
+        _client = _create_client()
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client (created on demand if the lifespan hasn't run, e.g. in scripts)."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+# ── Requests ──────────────────────────────────────────────────
+async def request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a request on the shared pool, recording latency and concurrency."""
+    client = get_http_client()
+    _stats["requests"] += 1
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    start = time.perf_counter()
+    try:
+        return await client.request(method, url, **kwargs)
+    except httpx.RequestError:
+        _stats["errors"] += 1
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _stats["in_flight"] -= 1
+        _stats["total_ms"] += elapsed * 1000
+        metrics.observe_span("upstream", httpx.URL(url).host, elapsed)
+
+
+def pool_stats() -> dict:
+    """Request counters plus live connection-pool usage."""
+    settings = get_settings()
+    stats = {
+        **_stats,
+        "avg_ms": round(_stats["total_ms"] / _stats["requests"], 2) if _stats["requests"] else 0.0,
+        "max_connections": settings.http_max_connections,
+    }
+    stats["total_ms"] = round(stats["total_ms"], 2)
+
+    # httpx exposes no public pool API; read httpcore's connection list defensively
+    if _client is None:
+        return stats
+    try:
+        pool = _client._transport._pool
+        connections = pool.connections
+        idle = sum(1 for c in connections if c.is_idle())
+        stats["connections"] = {
+            "open": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "utilization": round((len(connections) - idle) / settings.http_max_connections, 3),
+        }
+        stats["http2"] = pool._http2
+    except AttributeError:
+        pass
+    return stats
@@ -0,0 +1,170 @@
+"""
+FarmEase Backend — Image Ingest
+───────────────────────────────
+Memory-bounded path from an uploaded photo to a model-ready batch:
+
+  • UploadLimitMiddleware — rejects oversized request bodies with 413 while
+    they stream in (Content-Length first, then a running byte count), so a
+    huge upload is never buffered
+  • decode_rgb            — JPEG draft mode lets libjpeg decode straight to
+    1/2, 1/4 or 1/8 scale instead of materializing a 12 MP bitmap
+  • BatchBuffer           — uint8 samples are normalized into one reused
+    float32 batch array instead of a fresh float64 array per request
+  • stage / StageStats    — per-stage wall time for Server-Timing and /stats
+"""
+
+import io
+import time
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+import numpy as np
+from PIL import Image
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# ── Upload size cap ───────────────────────────────────────────
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """Caps request body size for the given path prefixes (bytes)."""
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, path: str):
+        for prefix, limit in self.limits.items():
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self._limit_for(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        started = False
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if exceeded:
+                # The body parser may turn our error into its own 400; answer 413 instead
+                if not started:
+                    started = True
+                    await self._reject(send, limit)
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            if not started:
+                await self._reject(send, limit)
+
+    @staticmethod
+    async def _reject(send: Send, limit: int) -> None:
+        body = f'{{"detail":"Upload exceeds the {limit / (1024 * 1024):g} MB limit."}}'.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# ── Decoding ──────────────────────────────────────────────────
+def decode_rgb(contents: bytes, size: tuple[int, int]) -> Image.Image:
+    """Decode to RGB at no less than `size`, using reduced-resolution JPEG decoding."""
+    image = Image.open(io.BytesIO(contents))
+    # JPEG only (no-op for other formats): picks the largest DCT scale
+    # that still leaves both sides >= the requested size
+    image.draft("RGB", size)
+    return image.convert("RGB")
+
+
+def resize_uint8(image: Image.Image, size: tuple[int, int]) -> np.ndarray:
+    """Resize to exactly `size` → contiguous (h, w, 3) uint8 array."""
+    # reducing_gap: box-reduce by an integer factor first, then resample the rest
+    return np.asarray(image.resize(size, reducing_gap=3.0), dtype=np.uint8)
+
+
+class BatchBuffer:
+    """Reused float32 batch array that uint8 samples are normalized into.
+
+    Not thread-safe: meant for a MicroBatcher, which keeps one batch in
+    flight at a time, so the previous batch is done before the next fill.
+    """
+
+    def __init__(self, max_batch: int, sample_shape: Sequence[int]):
+        self._buffer = np.empty((max_batch, *sample_shape), dtype=np.float32)
+
+    def fill(self, samples: Sequence[np.ndarray]) -> np.ndarray:
+        batch = self._buffer[:len(samples)]
+        for row, sample in zip(batch, samples):
+            np.divide(sample, np.float32(255.0), out=row)
+        return batch
+
+
+# ── Stage timing ──────────────────────────────────────────────
+@contextmanager
+def stage(timings: dict[str, float], name: str) -> Iterator[None]:
+    """Add the block's wall time (ms) to `timings[name]`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def server_timing(timings: dict[str, float]) -> str:
+    """Format stage timings as a Server-Timing header value."""
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+
+
+class StageStats:
+    """Running count / mean / max per stage, for /stats."""
+
+    def __init__(self):
+        self._totals: dict[str, list[float]] = {}
+
+    def record(self, timings: dict[str, float]) -> None:
+        for name, ms in timings.items():
+            total = self._totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += ms
+            total[2] = max(total[2], ms)
+
+    def stats(self) -> dict:
+        return {
+            name: {"count": count, "avg_ms": round(total / count, 2), "max_ms": round(peak, 2)}
+            for name, (count, total, peak) in self._totals.items()
+        }
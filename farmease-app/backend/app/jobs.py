@@ -0,0 +1,195 @@
+"""
+FarmEase Backend — Background Job Queue
+───────────────────────────────────────
+Runs submitted work on a fixed pool of worker tasks and keeps each
+result until it is collected, so clients on slow links can submit, drop
+the connection and poll for the answer instead of holding a request open
+through inference.
+
+  • bounded queue: `submit()` raises JobQueueFull past `max_queue`
+    (→ 503 with Retry-After), so load can't pile up unbounded
+  • `wait(job, timeout)` lets a poll block until the job finishes
+    (long-polling) without spinning
+  • finished jobs are kept for `ttl_s`, and at most `max_jobs` of them;
+    the oldest are evicted first, and queued / running jobs never are
+
+Jobs live in the worker process that accepted them.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+
+from app import metrics
+from app.executor import InferenceQueueFull
+
+Work = Callable[[], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue already holds its maximum pending jobs."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("job queue is full")
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    id: str
+    seq: int
+    created_at: float  # wall clock, for clients
+    status: str = "queued"  # queued → running → done | failed
+    result: Any = None
+    error: Optional[dict] = None  # {"status_code": ..., "detail": ...}
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    work: Optional[Work] = None  # dropped once run, with the input it holds
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class JobQueue:
+    """Bounded FIFO of async jobs run by `workers` concurrent tasks."""
+
+    def __init__(self, name: str, workers: int, max_queue: int, ttl_s: float, max_jobs: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.ttl_s = ttl_s
+        self.max_jobs = max(1, max_jobs)
+
+        self._jobs: dict[str, Job] = {}
+        self._finished: OrderedDict[str, float] = OrderedDict()  # id → monotonic finish time
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._submitted = 0
+        self._taken = 0
+        self._running = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0, "evicted": 0}
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    # ── Public API ────────────────────────────────────────────
+    def submit(self, work: Work) -> Job:
+        """Queue `work` (an async callable) and return its job immediately."""
+        self._ensure_workers()
+        self._prune()
+        if self._queue.qsize() >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise JobQueueFull()
+        job = Job(id=uuid.uuid4().hex, seq=self._submitted, created_at=time.time(), work=work)
+        self._submitted += 1
+        self._jobs[job.id] = job
+        self._queue.put_nowait((job, time.perf_counter()))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: float) -> None:
+        """Return when the job has finished or `timeout` seconds have passed."""
+        if timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def position(self, job: Job) -> Optional[int]:
+        """Jobs ahead of a queued job (None once it has started)."""
+        return job.seq - self._taken if job.status == "queued" else None
+
+    def stats(self) -> dict:
+        finished = self._stats["completed"] + self._stats["failed"]
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "stored": len(self._jobs),
+            "submitted": self._submitted,
+            "avg_wait_ms": round(self._wait_total / self._taken * 1000, 1) if self._taken else 0.0,
+            "avg_run_ms": round(self._run_total / finished * 1000, 1) if finished else 0.0,
+        }
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs are failed."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                job, _ = self._queue.get_nowait()
+                self._finish(job, error={"status_code": 503, "detail": "Server is shutting down, please resubmit."})
+        self._queue = None
+
+    # ── Internals ─────────────────────────────────────────────
+    def _ensure_workers(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._queue is None or not self._tasks or all(task.done() for task in self._tasks):
+            loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            job, queued_at = await self._queue.get()
+            self._taken += 1
+            started = time.perf_counter()
+            self._wait_total += started - queued_at
+            metrics.observe_span(self.name, "queue_wait", started - queued_at)
+
+            job.status = "running"
+            job.started_at = time.time()
+            work, job.work = job.work, None
+            self._running += 1
+            try:
+                self._finish(job, result=await work())
+            except HTTPException as e:
+                self._finish(job, error={"status_code": e.status_code, "detail": e.detail})
+            except InferenceQueueFull:
+                self._finish(job, error={"status_code": 503, "detail": "Inference service is busy, please resubmit."})
+            except asyncio.CancelledError:
+                self._finish(job, error={"status_code": 503, "detail": "Server is shutting down, please resubmit."})
+                raise
+            except Exception as e:
+                print(f"⚠️  {self.name} job {job.id} failed: {e}")
+                self._finish(job, error={"status_code": 500, "detail": "Job failed."})
+            finally:
+                self._running -= 1
+                elapsed = time.perf_counter() - started
+                self._run_total += elapsed
+                metrics.observe_span(self.name, "run", elapsed)
+
+    def _finish(self, job: Job, result: Any = None, error: Optional[dict] = None) -> None:
+        job.status = "failed" if error is not None else "done"
+        job.result, job.error = result, error
+        job.finished_at = time.time()
+        self._stats["failed" if error is not None else "completed"] += 1
+        self._finished[job.id] = time.monotonic()
+        job.done.set()
+
+    def _prune(self) -> None:
+        """Evict finished jobs past their TTL, then the oldest beyond `max_jobs` finished ones."""
+        cutoff = time.monotonic() - self.ttl_s
+        finished = self._finished
+        while finished:
+            job_id, finished_at = next(iter(finished.items()))
+            # Only finished jobs count against the cap: queued and running
+            # ones are bounded by max_queue and workers
+            if finished_at >= cutoff and len(finished) <= self.max_jobs:
+                break
+            finished.popitem(last=False)
+            del self._jobs[job_id]
+            self._stats["evicted"] += 1
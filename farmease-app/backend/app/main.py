@@ -5,14 +5,76 @@ Serves ML prediction endpoints, weather proxy, and marketplace CRUD.
 Run with:  uvicorn app.main:app --reload
 """
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app import db, http_client, metrics
+from app.admission import AdmissionController, AdmissionMiddleware
 from app.config import get_settings
-from app.routes import disease, crop, fertilizer, weather, marketplace
+from app.executor import InferenceQueueFull, get_executor
+from app.ingest import UploadLimitMiddleware
+from app.prediction_log import get_prediction_log
+from app.rate_limit import RateLimiter, RateLimitMiddleware, create_buckets
+from app.registry import get_registry
+from app.routes import disease, crop, fertilizer, weather, marketplace, models
+from app.warmup import is_ready, mark_ready, readiness, warm_up_models
 
 settings = get_settings()
 
+admission = AdmissionController(
+    route_limits=settings.admission_route_limits,
+    latency_targets_ms=settings.admission_latency_targets_ms,
+    max_in_flight=settings.admission_max_in_flight,
+    inference_share=settings.admission_inference_share,
+    enabled=settings.admission_enabled,
+)
+rate_limiter = RateLimiter(
+    create_buckets(settings.rate_limit_redis_url, settings.rate_limit_max_keys),
+    per_minute=settings.rate_limit_per_minute,
+    burst=settings.rate_limit_burst,
+    ip_multiplier=settings.rate_limit_ip_multiplier,
+    trust_forwarded_for=settings.rate_limit_trust_forwarded_for,
+    enabled=settings.rate_limit_enabled,
+    max_keys=settings.rate_limit_max_keys,
+)
+
+
+# ── Lifespan (startup / shutdown) ─────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm models in the background so /health/live answers immediately;
+    # requests that arrive early wait on the same single load.
+    warmup_task = None
+    if settings.eager_model_loading:
+        warmup_task = asyncio.create_task(warm_up_models())
+    else:
+        mark_ready()
+
+    await http_client.startup()
+    await db.startup()
+
+    watcher_task = None
+    if settings.registry_watch_interval_s > 0:
+        watcher_task = asyncio.create_task(get_registry().watch(settings.registry_watch_interval_s))
+
+    yield
+
+    for task in (warmup_task, watcher_task):
+        if task is not None and not task.done():
+            task.cancel()
+    await disease.shutdown()
+    await marketplace.shutdown()
+    await rate_limiter.aclose()
+    await get_prediction_log().close()
+    await db.shutdown()
+    await http_client.shutdown()
+    get_executor().shutdown()
+
+
 # ── App instance ──────────────────────────────────────────────
 app = FastAPI(
     title="FarmEase API",
@@ -20,23 +82,65 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+)
+
+# ── Request body caps (413 before the body is buffered) ────
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/predict/disease": int(settings.disease_upload_max_mb * 1024 * 1024),
+        "/predict/crop/batch": int(settings.crop_batch_max_mb * 1024 * 1024),
+    },
 )
 
+# ── Admission control (429 / 503 with Retry-After under overload) ──
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# ── Per-client rate limits (checked before admission: cheapest rejection first) ──
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# ── Request timing (measures everything below) ──────────────
+app.add_middleware(metrics.MetricsMiddleware)
+
 # ── CORS (allow mobile app to call us) ───────────────────────
+# Added last so it wraps every other middleware: 413 / 429 / 503
+# rejections carry the CORS headers too, and browsers can read Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+# ── Backpressure: inference pools full → 503 ─────────────────
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Inference service is busy, please retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# ── Database too slow → 504 ───────────────────────────────────
+@app.exception_handler(db.QueryTimeout)
+async def query_timeout_handler(request: Request, exc: db.QueryTimeout):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": "The database took too long to respond, please retry."},
+    )
+
+
 # ── Register routers ─────────────────────────────────────────
 app.include_router(disease.router, prefix="/predict", tags=["Disease Detection"])
 app.include_router(crop.router, prefix="/predict", tags=["Crop Recommendation"])
 app.include_router(fertilizer.router, prefix="/predict", tags=["Fertilizer Advisory"])
 app.include_router(weather.router, prefix="/api", tags=["Weather"])
 app.include_router(marketplace.router, prefix="/api", tags=["Marketplace"])
+app.include_router(models.router, tags=["Models"])
 
 
 # ── Health check ──────────────────────────────────────────────
@@ -52,4 +156,51 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", **readiness()}
+
+
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    """The process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """Models are loaded and warmed (503 until then)."""
+    status = readiness()
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up", **status})
+    return {"status": "ready", **status}
+
+
+@app.get("/stats", tags=["Health"])
+async def runtime_stats():
+    """Queue depths and pool utilization of the serving subsystems."""
+    return _runtime_stats()
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request latency histograms, stage spans and /stats in Prometheus text format."""
+    return PlainTextResponse(
+        metrics.render(_runtime_stats()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _runtime_stats() -> dict:
+    return {
+        "executor": get_executor().stats(),
+        "disease_batcher": disease.batcher_stats(),
+        "disease_cache": disease.cache_stats(),
+        "disease_ingest": disease.ingest_stats(),
+        "disease_jobs": disease.job_stats(),
+        "http_pool": http_client.pool_stats(),
+        "weather_cache": weather.cache_stats(),
+        "marketplace_cache": marketplace.cache_stats(),
+        "prediction_log": get_prediction_log().stats(),
+        "db_queries": db.query_stats(),
+        "admission": admission.stats(),
+        "rate_limit": rate_limiter.stats(),
+    }
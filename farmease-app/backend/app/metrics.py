@@ -0,0 +1,236 @@
+"""
+FarmEase Backend — Metrics
+──────────────────────────
+Request latency histograms, per-stage spans and a Prometheus text
+exposition of everything (served at /metrics).
+
+  • `MetricsMiddleware` times every request, labelled by router
+    (disease, crop, fertilizer, weather, marketplace, other), method and
+    status class
+  • `span(component, name)` / `observe_span(...)` time one stage of a
+    request: decode, preprocess, inference, database queries, upstream calls
+  • `render(stats)` also exports the numeric leaves of /stats as gauges
+
+Recording is a bisect and two increments on the event loop thread (no
+locks, no allocation per observation), cheap enough to leave on in
+production. Metrics are per process: under gunicorn each scrape reports
+the worker that answered it (its pid is in `farmease_worker_info`).
+"""
+
+import bisect
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Seconds; covers a cached marketplace page (~1 ms) to a cold CNN upload
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_INF = 'le="+Inf"'
+
+ROUTERS = (
+    ("/predict/disease", "disease"),
+    ("/predict/crop", "crop"),
+    ("/predict/fertilizer", "fertilizer"),
+    ("/api/weather", "weather"),
+    ("/api/marketplace", "marketplace"),
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels → [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            base = _labels(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_join(base, f"le={_quote(_num(bound))}")} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_join(base, _INF)} {cumulative}")
+            lines.append(f"{self.name}_sum{_braces(base)} {_num(series[-1])}")
+            lines.append(f"{self.name}_count{_braces(base)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_braces(_labels(zip(self.labelnames, labels)))} {_num(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+# ── Registry ──────────────────────────────────────────────────
+REQUEST_SECONDS = Histogram(
+    "farmease_request_duration_seconds", "HTTP request latency.", ("router", "method", "status")
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "farmease_requests_in_flight", "Requests currently being served.", ("router",)
+)
+SPAN_SECONDS = Histogram(
+    "farmease_span_duration_seconds", "Time spent in one stage of a request.", ("component", "span")
+)
+
+_METRICS = (REQUEST_SECONDS, REQUESTS_IN_FLIGHT, SPAN_SECONDS)
+
+
+def observe_span(component: str, name: str, seconds: float) -> None:
+    SPAN_SECONDS.observe(seconds, component, name)
+
+
+@contextmanager
+def span(component: str, name: str) -> Iterator[None]:
+    """Time the block as stage `name` of `component` (e.g. "crop", "inference")."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - start, component, name)
+
+
+def router_for(path: str) -> str:
+    for prefix, router in ROUTERS:
+        if path.startswith(prefix):
+            return router
+    return "other"
+
+
+# ── Middleware ────────────────────────────────────────────────
+class MetricsMiddleware:
+    """Pure ASGI timing middleware (no per-request task or body buffering)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = router_for(scope["path"])
+        status = "5xx"  # if the app raises before responding
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = f"{message['status'] // 100}xx"
+            await send(message)
+
+        in_flight = (router,)
+        REQUESTS_IN_FLIGHT.inc(*in_flight)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            REQUESTS_IN_FLIGHT.inc(*in_flight, amount=-1)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, router, scope["method"], status)
+
+
+# ── Exposition ────────────────────────────────────────────────
+# /stats sections whose keys are names (queries, stages) become a label
+_LABELLED_SECTIONS = {"db_queries": "query", "disease_ingest": "stage", "admission": "route"}
+
+
+def render(stats: dict[str, Any]) -> str:
+    """Prometheus text format: the metrics above plus /stats as gauges."""
+    lines: list[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+
+    worker = _labels([("worker", str(os.getpid()))])
+    lines.append("# HELP farmease_worker_info The worker process serving this scrape.")
+    lines.append("# TYPE farmease_worker_info gauge")
+    lines.append(f"farmease_worker_info{_braces(worker)} 1")
+
+    # Group samples by family first: each family is written once, contiguously
+    families: dict[str, tuple[str, list[tuple[str, float]]]] = {}
+    for section, values in stats.items():
+        if section in _LABELLED_SECTIONS:
+            label = _LABELLED_SECTIONS[section]
+            for key, nested in values.items():
+                for name, value in _flatten(nested):
+                    _gauge_sample(families, section, name, _labels([(label, key)]), value)
+        else:
+            for name, value in _flatten(values):
+                _gauge_sample(families, section, name, "", value)
+
+    for family, (help, samples) in families.items():
+        lines.append(f"# HELP {family} {help}")
+        lines.append(f"# TYPE {family} gauge")
+        lines.extend(f"{family}{_braces(labels)} {_num(value)}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def _flatten(values: Any, prefix: str = "") -> Iterator[tuple[str, float]]:
+    if isinstance(values, dict):
+        for key, value in values.items():
+            yield from _flatten(value, f"{prefix}{key}_" if isinstance(value, dict) else f"{prefix}{key}")
+    elif isinstance(values, bool):
+        yield prefix, float(values)
+    elif isinstance(values, (int, float)):
+        yield prefix, values
+
+
+def _gauge_sample(families: dict, section: str, name: str, labels: str, value: float) -> None:
+    family = "".join(c if c.isalnum() or c == "_" else "_" for c in f"farmease_{section}_{name}")
+    if family not in families:
+        families[family] = (f"{section} {name} from /stats.", [])
+    families[family][1].append((labels, value))
+
+
+def _labels(pairs) -> str:
+    return ",".join(f"{name}={_quote(value)}" for name, value in pairs)
+
+
+def _quote(value: str) -> str:
+    escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _join(base: str, extra: str) -> str:
+    return "{" + (f"{base},{extra}" if base else extra) + "}"
+
+
+def _braces(labels: str) -> str:
+    return "{" + labels + "}" if labels else ""
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,270 @@
+"""
+FarmEase Backend — Prediction Log (write-behind)
+────────────────────────────────────────────────
+Persists predictions to `disease_logs` / `crop_logs` without touching the
+request path: `record()` only appends to an in-memory buffer, and a
+background task bulk-inserts each table's rows once a batch fills up or
+the flush interval passes.
+
+  • a failed insert (database down, network blip) is written to a bounded
+    on-disk spool and replayed after the next successful flush
+  • every row gets its `id` and `created_at` when recorded and is
+    inserted with ON CONFLICT DO NOTHING, so replaying a batch that did
+    reach the database (e.g. a timeout after the commit) can't duplicate
+    rows, and a replayed row keeps the time of its prediction
+  • a worker claims a spool file before replaying it; claims held by a
+    dead process, or older than `claim_ttl_s`, are released for retry
+  • past the buffer or spool limits, rows are dropped and counted rather
+    than growing memory / disk without bound
+  • `close()` (app shutdown) flushes whatever is buffered, spooling the rest
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+
+from app import db
+from app.config import get_settings
+
+
+class PredictionLog:
+    """Buffered, batched inserts into Supabase tables with a disk spool."""
+
+    def __init__(
+        self,
+        batch_rows: int = 200,
+        flush_interval_s: float = 2.0,
+        max_buffer: int = 10000,
+        spool_dir: Optional[Path] = None,
+        spool_max_bytes: int = 64 * 1024 * 1024,
+        claim_ttl_s: float = 300.0,
+    ):
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval = flush_interval_s
+        self.max_buffer = max_buffer
+        self.spool_dir = spool_dir
+        self.spool_max_bytes = spool_max_bytes
+        self.claim_ttl_s = claim_ttl_s
+
+        self._buffers: dict[str, deque] = {}
+        self._buffered = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._spool_bytes = self._scan_spool()
+        self._stats = {
+            "recorded": 0,
+            "inserted": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "spooled_rows": 0,
+            "replayed_rows": 0,
+            "rejected": 0,
+            "dropped": 0,
+        }
+
+    # ── Request path ──────────────────────────────────────────
+    def record(self, table: str, row: dict) -> None:
+        """Queue one row for `table`. Never blocks, never raises."""
+        if self._buffered >= self.max_buffer:
+            self._stats["dropped"] += 1
+            return
+        self._ensure_worker()
+        # Client-side key: a replayed row that already landed is skipped
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        self._buffers.setdefault(table, deque()).append(row)
+        self._buffered += 1
+        self._stats["recorded"] += 1
+        if self._buffered >= self.batch_rows:
+            self._wake.set()
+
+    # ── Lifecycle ─────────────────────────────────────────────
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._wake = asyncio.Event()
+            self._worker = loop.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop the flusher and write out everything still buffered."""
+        if self._worker is not None and not self._worker.done():
+            # Let an in-progress flush finish rather than cancelling mid-insert
+            self._closing = True
+            self._wake.set()
+            await self._worker
+            self._closing = False
+        self._worker = None
+        await self.flush()
+
+    # ── Flushing ──────────────────────────────────────────────
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Insert all buffered rows in batches; replay the spool if the database is reachable."""
+        healthy = True
+        for table, buffer in list(self._buffers.items()):
+            while buffer:
+                rows = [buffer.popleft() for _ in range(min(self.batch_rows, len(buffer)))]
+                self._buffered -= len(rows)
+                # Once the database is unreachable, spool the rest without retrying
+                if healthy and await self._insert(table, rows):
+                    continue
+                healthy = False
+                self._spool(table, rows)
+        if healthy:
+            self._release_stale_claims()
+            if self._spool_files():
+                await self._replay_spool()
+
+    async def _insert(self, table: str, rows: list[dict]) -> bool:
+        """False only if the database couldn't be reached (the rows should be retried)."""
+        try:
+            await db.execute(
+                db.table(table).upsert(rows, returning=ReturnMethod.minimal, ignore_duplicates=True, on_conflict="id"),
+                f"{table}.insert",
+            )
+        except APIError as e:
+            # The database answered but refused the batch (e.g. an unknown
+            # user_id); retrying can't help, so salvage the valid rows
+            if len(rows) > 1:
+                for row in rows:
+                    if not await self._insert(table, [row]):
+                        self._spool(table, [row])
+            else:
+                self._stats["rejected"] += 1
+                print(f"⚠️  {table} rejected a row: {e.message}")
+            return True
+        except Exception as e:
+            self._stats["failed_batches"] += 1
+            print(f"⚠️  Could not write {len(rows)} rows to {table}: {e}")
+            return False
+        self._stats["batches"] += 1
+        self._stats["inserted"] += len(rows)
+        return True
+
+    # ── Disk spool ────────────────────────────────────────────
+    def _spool_files(self) -> list[Path]:
+        if self.spool_dir is None or not self.spool_dir.is_dir():
+            return []
+        return sorted(self.spool_dir.glob("*.json"))
+
+    def _scan_spool(self) -> int:
+        return sum(path.stat().st_size for path in self._spool_files())
+
+    def _spool(self, table: str, rows: list[dict]) -> None:
+        payload = json.dumps({"table": table, "rows": rows}, default=str).encode()
+        if self.spool_dir is None or self._spool_bytes + len(payload) > self.spool_max_bytes:
+            self._stats["dropped"] += len(rows)
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        # Sortable by creation time, so replay keeps insertion order
+        path = self.spool_dir / f"{time.time_ns()}-{table}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+        self._spool_bytes += len(payload)
+        self._stats["spooled_rows"] += len(rows)
+
+    def _release_stale_claims(self) -> None:
+        """Return claims whose worker died, or that were held past the TTL, to the spool."""
+        if self.spool_dir is None or not self.spool_dir.is_dir():
+            return
+        cutoff = time.time() - self.claim_ttl_s
+        for claimed in self.spool_dir.glob("*.claim"):
+            pid = claimed.suffixes[-2][1:] if len(claimed.suffixes) >= 2 else ""
+            try:
+                if claimed.stat().st_mtime >= cutoff and pid.isdigit() and _pid_alive(int(pid)):
+                    continue
+                os.rename(claimed, claimed.with_name(claimed.name.split(".", 1)[0] + ".json"))
+            except FileNotFoundError:
+                continue  # replayed or released by another worker meanwhile
+            print(f"⚠️  Released stale prediction log claim {claimed.name}")
+
+    async def _replay_spool(self) -> None:
+        for path in self._spool_files():
+            # Claim the file first: other workers may share the spool directory
+            claimed = path.with_suffix(f".{os.getpid()}.claim")
+            try:
+                os.rename(path, claimed)
+                os.utime(claimed)  # the claim's age starts now
+            except FileNotFoundError:
+                continue
+            size = claimed.stat().st_size
+            try:
+                batch = json.loads(claimed.read_bytes())
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Discarding unreadable spool file {path.name}: {e}")
+            else:
+                # Spooled before rows carried these: the file name holds the spool time
+                spooled_at = _spool_time(path)
+                for row in batch["rows"]:
+                    row.setdefault("id", str(uuid.uuid4()))
+                    if spooled_at is not None:
+                        row.setdefault("created_at", spooled_at)
+                if not await self._insert(batch["table"], batch["rows"]):
+                    os.rename(claimed, path)  # still down — keep it for later
+                    return
+                self._stats["replayed_rows"] += len(batch["rows"])
+            claimed.unlink(missing_ok=True)
+            self._spool_bytes = max(0, self._spool_bytes - size)
+
+    # ── Introspection ─────────────────────────────────────────
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "buffered": self._buffered,
+            "spool_bytes": self._spool_bytes,
+            "spool_files": len(self._spool_files()),
+        }
+
+
+def _spool_time(path: Path) -> Optional[str]:
+    try:
+        return datetime.fromtimestamp(int(path.name.split("-", 1)[0]) / 1e9, timezone.utc).isoformat()
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+@lru_cache()
+def get_prediction_log() -> PredictionLog:
+    settings = get_settings()
+    return PredictionLog(
+        batch_rows=settings.prediction_log_batch_rows,
+        flush_interval_s=settings.prediction_log_flush_interval_s,
+        max_buffer=settings.prediction_log_max_buffer,
+        spool_dir=settings.prediction_log_spool_abs,
+        spool_max_bytes=int(settings.prediction_log_spool_max_mb * 1024 * 1024),
+        claim_ttl_s=settings.prediction_log_claim_ttl_s,
+    )
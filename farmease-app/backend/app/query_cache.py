@@ -0,0 +1,225 @@
+"""
+FarmEase Backend — Tagged Query Cache
+─────────────────────────────────────
+Read-through cache for database query results that writes invalidate
+precisely. Each cached value carries tags (e.g. "product:<id>",
+"cat:Vegetables"), and a write drops exactly the entries that carry the
+tags it touched.
+
+  • in-process store (app.cache.TTLCache) by default
+  • optional Redis store, shared by every worker, so an invalidation on
+    one worker is seen by all of them (the in-process store only
+    invalidates the worker that handled the write; the others serve
+    their copy until its TTL)
+  • concurrent misses for one key share one query, and a result fetched
+    across an invalidation is returned but never stored
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.cache import TTLCache
+
+Fetch = Callable[[], Awaitable[Any]]
+
+
+# ── Stores ────────────────────────────────────────────────────
+class LocalStore:
+    """Per-process store: TTLCache entries plus a tag → keys index."""
+
+    def __init__(self, max_bytes: int):
+        self._cache = TTLCache(max_bytes=max_bytes)
+        self._tags: dict[str, set[str]] = {}
+        self._indexed = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        self._cache.set(key, value, ttl)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+            self._indexed += 1
+        # Evicted / expired keys linger in the index; rebuild it now and then
+        if self._indexed > 4 * len(self._cache) + 1024:
+            self._prune()
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                if key in self._cache:
+                    self._cache.delete(key)
+                    dropped += 1
+        return dropped
+
+    def _prune(self) -> None:
+        self._tags = {
+            tag: live for tag, keys in self._tags.items()
+            if (live := {key for key in keys if key in self._cache})
+        }
+        self._indexed = sum(len(keys) for keys in self._tags.values())
+
+    async def aclose(self) -> None:
+        self._cache.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        cache = self._cache.stats()
+        return {"backend": "local", "entries": cache["entries"], "bytes": cache["bytes"], "tags": len(self._tags)}
+
+
+class RedisStore:
+    """Shared store on Redis (or anything speaking its protocol).
+
+    Values are JSON strings with a TTL; each tag is a Redis set of the keys
+    carrying it. `client` is a `redis.asyncio` client or a compatible
+    stand-in.
+    """
+
+    def __init__(self, client: Any, prefix: str = "farmease:qc:"):
+        self._redis = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self._prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        ttl_ms = max(1, int(ttl * 1000))
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.set(self._prefix + key, json.dumps(value, separators=(",", ":"), default=str), px=ttl_ms)
+        for tag in tags:
+            tag_key = f"{self._prefix}tag:{tag}"
+            pipe.sadd(tag_key, key)
+            # A tag set outlives its keys by at most one TTL
+            pipe.pexpire(tag_key, ttl_ms)
+        await pipe.execute()
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        tag_keys = [f"{self._prefix}tag:{tag}" for tag in tags]
+        pipe = self._redis.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = await pipe.execute()
+        keys = {self._prefix + _text(key) for group in members for key in group}
+        if keys:
+            await self._redis.delete(*keys)
+        await self._redis.delete(*tag_keys)
+        return len(keys)
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_store(redis_url: str, max_bytes: int):
+    """Redis store when a URL is configured (and redis-py is installed), else local."""
+    if redis_url:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            print("⚠️  redis is not installed — using the in-process query cache")
+        else:
+            return RedisStore(redis.from_url(redis_url))
+    return LocalStore(max_bytes)
+
+
+# ── Read-through cache ────────────────────────────────────────
+class TaggedCache:
+    """Read-through cache over a store, with tag invalidation and hit-rate stats."""
+
+    def __init__(self, store, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Bumped by every invalidation; a fetch that straddles one is not stored
+        self._epoch = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "skipped_stores": 0,
+            "invalidations": 0,
+            "invalidated_entries": 0,
+            "store_errors": 0,
+        }
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Fetch,
+        ttl: float,
+        tags: Callable[[Any], Iterable[str]],
+    ) -> Any:
+        """Cached value for `key`, or `fetch()` stored under the tags `tags(value)`."""
+        if not self.enabled:
+            return await fetch()
+
+        try:
+            value = await self.store.get(key)
+        except Exception as e:
+            self._store_error("read", e)
+            value = None
+        if value is not None:
+            self._stats["hits"] += 1
+            return value
+
+        self._stats["misses"] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, fetch, ttl, tags))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+        # shield: one caller disconnecting must not cancel everyone's fetch
+        return await asyncio.shield(future)
+
+    async def _load(self, key: str, fetch: Fetch, ttl: float, tags) -> Any:
+        epoch = self._epoch
+        value = await fetch()
+        if self._epoch != epoch:
+            # A write landed while we were reading; this result may predate it
+            self._stats["skipped_stores"] += 1
+            return value
+        try:
+            await self.store.set(key, value, ttl, list(tags(value)))
+        except Exception as e:
+            self._store_error("write", e)
+        return value
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of `tags`."""
+        if not self.enabled:
+            return
+        self._epoch += 1
+        self._stats["invalidations"] += 1
+        try:
+            self._stats["invalidated_entries"] += await self.store.invalidate(tags)
+        except Exception as e:
+            self._store_error("invalidate", e)
+
+    def _store_error(self, op: str, error: Exception) -> None:
+        # The database stays the source of truth; a broken cache only costs hits
+        self._stats["store_errors"] += 1
+        print(f"⚠️  Query cache {op} failed: {error}")
+
+    async def aclose(self) -> None:
+        await self.store.aclose()
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "enabled": self.enabled,
+            **self.store.stats(),
+        }
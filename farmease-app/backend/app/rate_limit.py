@@ -0,0 +1,258 @@
+"""
+FarmEase Backend — Rate Limiting
+────────────────────────────────
+Per-client token buckets in front of the expensive routes, so one client
+retrying in a loop can't use up inference capacity or the OpenWeatherMap
+quota.
+
+  • a client is its X-API-Key (hashed), else its X-User-Id, else its IP
+    (the first X-Forwarded-For hop when RATE_LIMIT_TRUST_FORWARDED_FOR)
+  • each route group (see app.admission.ROUTES) has its own rate and
+    burst; a request takes one token, and an empty bucket answers 429
+    with Retry-After set to when the next token arrives
+  • identity headers are not authenticated, so a header-identified
+    client also draws from a per-IP bucket `ip_multiplier` times larger:
+    rotating the header doesn't escape the limit, and many users behind
+    one carrier NAT don't share a single client's quota
+  • buckets live in-process (per worker) by default, or in Redis (one
+    atomic script call per request) so all workers share them; if Redis
+    fails, the worker falls back to its own buckets until it recovers
+
+The in-process check is a few dict operations per request.
+"""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.admission import route_for
+
+Limit = tuple[str, float, float]  # (bucket key, tokens per second, burst)
+
+
+# ── Stores ────────────────────────────────────────────────────
+class LocalBuckets:
+    """Per-process token buckets, LRU-bounded to `max_keys` clients."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, limits: list[Limit]) -> float:
+        """Take one token from every bucket; 0 if allowed, else seconds until allowed."""
+        now = time.monotonic()
+        levels = []
+        wait = 0.0
+        for key, rate, burst in limits:
+            state = self._buckets.get(key)
+            tokens = burst if state is None else min(burst, state[0] + (now - state[1]) * rate)
+            levels.append(tokens)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+        if wait:
+            return wait
+
+        buckets = self._buckets
+        for (key, _, _), tokens in zip(limits, levels):
+            buckets[key] = (tokens - 1, now)
+            buckets.move_to_end(key)
+        while len(buckets) > self.max_keys:
+            buckets.popitem(last=False)  # evicting a bucket refills it
+        return 0.0
+
+    async def aclose(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "local", "keys": len(self._buckets)}
+
+
+# KEYS: bucket keys; ARGV: rate, burst per key. Returns the wait in seconds
+# as a string ("0" = allowed). Redis' own clock, so workers can't disagree.
+_TAKE_SCRIPT = """
+local now_t = redis.call('TIME')
+local now = tonumber(now_t[1]) + tonumber(now_t[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[2 * i - 1])
+  local burst = tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', key, 't', 'ts')
+  local tokens = burst
+  if state[1] then
+    tokens = math.min(burst, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+  end
+  levels[i] = tokens
+  if tokens < 1 then wait = math.max(wait, (1 - tokens) / rate) end
+end
+if wait > 0 then return tostring(wait) end
+for i, key in ipairs(KEYS) do
+  redis.call('HSET', key, 't', tostring(levels[i] - 1), 'ts', tostring(now))
+  -- Once full again the bucket carries no state worth keeping
+  redis.call('PEXPIRE', key, math.ceil(tonumber(ARGV[2 * i]) / tonumber(ARGV[2 * i - 1]) * 1000))
+end
+return "0"
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by all workers, one atomic Lua call per request.
+
+    `client` is a `redis.asyncio` client or a compatible stand-in: only
+    `register_script()` (an awaitable `script(keys=..., args=...)`) and
+    `aclose()` are used. All of a request's keys go to one script call,
+    so on Redis Cluster they would need a common hash tag.
+    """
+
+    def __init__(self, client: Any, prefix: str = "farmease:rl:"):
+        self._redis = client
+        self._prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, limits: list[Limit]) -> float:
+        keys = [self._prefix + key for key, _, _ in limits]
+        args = [value for _, rate, burst in limits for value in (rate, burst)]
+        wait = await self._take(keys=keys, args=args)
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+def create_buckets(redis_url: str, max_keys: int):
+    """Redis buckets when a URL is configured (and redis-py is installed), else local."""
+    if redis_url:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            print("⚠️  redis is not installed — using per-worker rate limits")
+        else:
+            return RedisBuckets(redis.from_url(redis_url))
+    return LocalBuckets(max_keys)
+
+
+# ── Limiter ───────────────────────────────────────────────────
+class RateLimiter:
+    """Per-route quotas applied to a bucket store."""
+
+    def __init__(
+        self,
+        store,
+        per_minute: dict[str, float],
+        burst: dict[str, float],
+        ip_multiplier: float = 10.0,
+        trust_forwarded_for: bool = False,
+        enabled: bool = True,
+        max_keys: int = 100_000,
+    ):
+        self.store = store
+        self.enabled = enabled
+        self.ip_multiplier = ip_multiplier
+        self.trust_forwarded_for = trust_forwarded_for
+        # group → (tokens per second, burst); groups without a rate are unlimited
+        self.quotas = {
+            group: (rate / 60, max(1.0, burst.get(group, rate / 6)))
+            for group, rate in per_minute.items()
+            if rate > 0
+        }
+        # Used while the shared store is unreachable
+        self._fallback = store if isinstance(store, LocalBuckets) else LocalBuckets(max_keys)
+        self._stats = {"allowed": 0, "limited": 0, "store_errors": 0}
+        self._limited: dict[str, int] = {}
+
+    def client(self, scope: Scope) -> tuple[str, Optional[str]]:
+        """(client key, IP key if the client was identified by a header)."""
+        api_key = user_id = forwarded = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                api_key = value
+            elif name == b"x-user-id":
+                user_id = value
+            elif name == b"x-forwarded-for":
+                forwarded = value
+
+        if forwarded is not None and self.trust_forwarded_for:
+            ip = forwarded.split(b",")[0].strip().decode("latin-1")
+        else:
+            client = scope.get("client")
+            ip = client[0] if client else "unknown"
+
+        # The shared per-IP bucket is separate from an anonymous client's own
+        if api_key:
+            return "key:" + hashlib.blake2b(api_key, digest_size=12).hexdigest(), "net:" + ip
+        if user_id:
+            return "user:" + user_id.decode("latin-1")[:64], "net:" + ip
+        return "ip:" + ip, None
+
+    async def check(self, scope: Scope) -> Optional[float]:
+        """None if the request may proceed, else seconds until it may."""
+        route = route_for(scope["path"])
+        quota = self.quotas.get(route[0]) if route else None
+        if quota is None:
+            return None
+
+        group = route[0]
+        rate, burst = quota
+        client, ip = self.client(scope)
+        limits = [(f"{group}:{client}", rate, burst)]
+        if ip is not None:
+            limits.append((f"{group}:{ip}", rate * self.ip_multiplier, burst * self.ip_multiplier))
+
+        try:
+            wait = await self.store.take(limits)
+        except Exception as e:
+            if self._stats["store_errors"] == 0:
+                print(f"⚠️  Rate limit store failed ({e}) — using per-worker buckets")
+            self._stats["store_errors"] += 1
+            wait = await self._fallback.take(limits)
+
+        if wait:
+            self._stats["limited"] += 1
+            self._limited[group] = self._limited.get(group, 0) + 1
+            return wait
+        self._stats["allowed"] += 1
+        return None
+
+    async def aclose(self) -> None:
+        await self.store.aclose()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "limited_by_route": dict(self._limited),
+            **self.store.stats(),
+        }
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware: 429 + Retry-After when the client's bucket is empty."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.limiter.enabled:
+            wait = await self.limiter.check(scope)
+            if wait is not None:
+                body = b'{"detail":"Rate limit exceeded, please retry later."}'
+                await send({
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
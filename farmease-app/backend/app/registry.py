@@ -0,0 +1,235 @@
+"""
+FarmEase Backend — Model Registry
+─────────────────────────────────
+Central home for every ML model the API serves. Each model lives in a
+named slot that:
+
+  • loads its file at most once, even under concurrent first requests
+  • watches the file and loads a changed version in the background
+  • swaps the new version in atomically — in-flight requests keep the
+    `ModelVersion` they already hold, so nothing is dropped mid-predict
+  • keeps the last N versions in memory for instant rollback
+
+Tip: publish a retrained model with an atomic rename (`mv tmp.pkl crop_model.pkl`)
+so the watcher never sees a half-written file.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.config import get_settings
+
+FileSignature = tuple[float, int]  # (mtime, size)
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """One loaded, immutable model version."""
+    name: str
+    version: str
+    model: Any
+    path: str
+    signature: FileSignature
+    loaded_at: float = field(default_factory=time.time)
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "loaded_at": datetime.fromtimestamp(self.loaded_at, timezone.utc).isoformat(),
+        }
+
+
+@dataclass
+class ModelSlot:
+    name: str
+    path: Path
+    loader: Callable[[Path], Any]
+    warm: Optional[Callable[[Any], None]] = None
+    current: Optional[ModelVersion] = None
+    history: deque = field(default_factory=deque)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Set after the first load attempt so a missing file is only reported once
+    checked: bool = False
+    # File signature seen on the previous poll (debounces files still being copied)
+    pending: Optional[FileSignature] = None
+    # Signature we rolled back from (or that failed to load) — don't hot-reload it
+    rejected: Optional[FileSignature] = None
+
+
+def _signature(path: Path) -> Optional[FileSignature]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def _version_id(path: Path, signature: FileSignature) -> str:
+    """Readable, content-addressed id: <mtime>-<sha256 prefix>."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    stamp = datetime.fromtimestamp(signature[0], timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return f"{stamp}-{digest.hexdigest()[:8]}"
+
+
+class ModelRegistry:
+    """Named, versioned model slots with hot reload and rollback."""
+
+    def __init__(self, keep_versions: int = 2):
+        self.keep_versions = max(0, keep_versions)
+        self._slots: dict[str, ModelSlot] = {}
+
+    def register(
+        self,
+        name: str,
+        path: Path,
+        loader: Callable[[Path], Any],
+        warm: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self._slots[name] = ModelSlot(
+            name=name,
+            path=Path(path),
+            loader=loader,
+            warm=warm,
+            history=deque(maxlen=self.keep_versions or None),
+        )
+
+    def names(self) -> list[str]:
+        return list(self._slots)
+
+    # ── Reads (hot path) ──────────────────────────────────────
+    def get(self, name: str) -> Optional[ModelVersion]:
+        """Active version of a model, loading it on first use (None if unavailable)."""
+        slot = self._slots[name]
+        current = slot.current
+        if current is not None or slot.checked:
+            return current
+
+        with slot.lock:
+            if slot.current is None and not slot.checked:
+                self._load_into(slot)
+                slot.checked = True
+            return slot.current
+
+    async def aget(self, name: str) -> Optional[ModelVersion]:
+        """`get()` for request handlers — a first-time load never blocks the event loop."""
+        slot = self._slots[name]
+        if slot.current is not None or slot.checked:
+            return slot.current
+        return await asyncio.to_thread(self.get, name)
+
+    # ── Writes ────────────────────────────────────────────────
+    def _load_into(self, slot: ModelSlot) -> bool:
+        """Load the slot's file as a new version and swap it in. Caller holds slot.lock."""
+        signature = _signature(slot.path)
+        if signature is None:
+            print(f"⚠️  {slot.name.capitalize()} model not found at {slot.path} — using fallback")
+            return False
+
+        try:
+            version_id = _version_id(slot.path, signature)
+            model = slot.loader(slot.path)
+            if slot.warm is not None:
+                slot.warm(model)
+        except Exception as e:
+            print(f"⚠️  Could not load {slot.name} model: {e}")
+            # Don't retry this exact file on every poll
+            slot.rejected = signature
+            return False
+
+        if _signature(slot.path) != signature:
+            # File was replaced mid-load — the next poll picks up the new one
+            return False
+
+        version = ModelVersion(
+            name=slot.name,
+            version=version_id,
+            model=model,
+            path=str(slot.path),
+            signature=signature,
+        )
+
+        if slot.current is not None and self.keep_versions:
+            slot.history.append(slot.current)
+        # Single reference assignment — readers see either old or new, never partial
+        slot.current = version
+        slot.rejected = None
+        print(f"✅ Loaded {slot.name} model version {version.version}")
+        return True
+
+    def reload(self, name: str) -> Optional[ModelVersion]:
+        """Force-load the file on disk as a new version; None if none was activated."""
+        slot = self._slots[name]
+        with slot.lock:
+            loaded = self._load_into(slot)
+            slot.checked = True
+            return slot.current if loaded else None
+
+    def rollback(self, name: str) -> Optional[ModelVersion]:
+        """Re-activate the previous version; returns None if there is none."""
+        slot = self._slots[name]
+        with slot.lock:
+            if not slot.history:
+                return None
+            if slot.current is not None:
+                slot.rejected = slot.current.signature
+            slot.current = slot.history.pop()
+            return slot.current
+
+    def poll(self) -> list[str]:
+        """Reload any model whose file changed and has been stable for one poll."""
+        reloaded = []
+        for slot in self._slots.values():
+            signature = _signature(slot.path)
+            active = slot.current.signature if slot.current else None
+            if signature is None or signature in (active, slot.rejected):
+                slot.pending = None
+                continue
+            if signature != slot.pending:
+                slot.pending = signature
+                continue
+
+            with slot.lock:
+                # A first-use load may have picked this file up while we waited
+                active = slot.current.signature if slot.current else None
+                if signature != active and self._load_into(slot):
+                    reloaded.append(slot.name)
+                slot.checked = True
+                slot.pending = None
+        return reloaded
+
+    async def watch(self, interval: float) -> None:
+        """Poll model files forever (run as a background task)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception as e:
+                print(f"⚠️  Model watcher error: {e}")
+
+    def info(self) -> dict:
+        return {
+            name: {
+                "path": str(slot.path),
+                "active": slot.current.info() if slot.current else None,
+                "previous": [v.info() for v in reversed(slot.history)],
+            }
+            for name, slot in self._slots.items()
+        }
+
+
+@lru_cache()
+def get_registry() -> ModelRegistry:
+    """Cached registry singleton shared by every router."""
+    return ModelRegistry(keep_versions=get_settings().registry_keep_versions)
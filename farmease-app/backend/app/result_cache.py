@@ -0,0 +1,111 @@
+"""
+FarmEase Backend — Disease Prediction Cache
+───────────────────────────────────────────
+Answers duplicate leaf uploads (network retries, photos forwarded between
+farmers) without running the CNN again. Three lookups, cheapest first:
+
+  1. digest of the raw upload bytes    — exact re-upload, skips decoding
+  2. digest of the decoded pixels      — same photo, different container/metadata
+  3. perceptual dHash within N bits    — re-compressed or resized copies (optional)
+
+Every key includes the model version, so a hot-swapped model never serves
+results from its predecessor. Entries live in a memory-bounded LRU.
+"""
+
+import hashlib
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from app.cache import TTLCache
+
+
+def digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def dhash(image: Image.Image) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbour?"""
+    small = np.asarray(image.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class _PerceptualIndex:
+    """Fixed-size ring of (dHash, pixel digest) pairs searched by Hamming distance."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._hashes = np.zeros(capacity, dtype=np.uint64)
+        self._keys: list[Optional[tuple[str, bytes]]] = [None] * capacity
+        self._next = 0
+
+    def add(self, version: str, phash: int, pixel_key: bytes) -> None:
+        slot = self._next % self.capacity
+        self._hashes[slot] = phash
+        self._keys[slot] = (version, pixel_key)
+        self._next += 1
+
+    def nearest(self, version: str, phash: int, max_distance: int) -> Optional[bytes]:
+        used = min(self._next, self.capacity)
+        if used == 0:
+            return None
+        xor = np.bitwise_xor(self._hashes[:used], np.uint64(phash))
+        distances = np.unpackbits(xor.view(np.uint8).reshape(used, 8), axis=1).sum(axis=1)
+        for slot in np.argsort(distances, kind="stable"):
+            if distances[slot] > max_distance:
+                break
+            entry_version, pixel_key = self._keys[slot]
+            if entry_version == version:
+                return pixel_key
+        return None
+
+
+class PredictionCache:
+    """Model-version-aware cache of disease predictions."""
+
+    def __init__(self, max_bytes: int, ttl: float, phash_distance: int = 0, phash_entries: int = 4096):
+        self.ttl = ttl
+        self.phash_distance = phash_distance
+        self._results = TTLCache(max_bytes=max_bytes)
+        self._index = _PerceptualIndex(phash_entries) if phash_distance > 0 else None
+        self._stats = {"raw_hits": 0, "pixel_hits": 0, "near_hits": 0, "misses": 0}
+
+    def get_raw(self, version: str, raw_key: bytes) -> Optional[dict]:
+        result = self._results.get((version, "raw", raw_key))
+        if result is not None:
+            self._stats["raw_hits"] += 1
+        return result
+
+    def get_decoded(self, version: str, pixel_key: bytes, phash: int) -> Optional[dict]:
+        result = self._results.get((version, "px", pixel_key))
+        if result is not None:
+            self._stats["pixel_hits"] += 1
+            return result
+
+        if self._index is not None:
+            near_key = self._index.nearest(version, phash, self.phash_distance)
+            if near_key is not None:
+                result = self._results.get((version, "px", near_key))
+                if result is not None:
+                    self._stats["near_hits"] += 1
+                    return result
+
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, version: str, raw_key: bytes, pixel_key: bytes, phash: int, result: dict) -> None:
+        self._results.set((version, "raw", raw_key), result, self.ttl)
+        self._results.set((version, "px", pixel_key), result, self.ttl)
+        if self._index is not None:
+            self._index.add(version, phash, pixel_key)
+
+    def stats(self) -> dict:
+        hits = self._stats["raw_hits"] + self._stats["pixel_hits"] + self._stats["near_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": self._results.stats()["entries"],
+        }
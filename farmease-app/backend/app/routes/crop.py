@@ -2,15 +2,30 @@
 Crop Recommendation Endpoint
 ─────────────────────────────
 POST /predict/crop
+POST /predict/crop/batch   (JSON array, NDJSON or CSV → streamed NDJSON)
 Accepts soil and climate parameters, runs through a pre-trained
 Random Forest model, and returns top crop suggestions.
 """
 
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from uuid import UUID
+
 import numpy as np
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
+from app import metrics
 from app.config import get_settings
+from app.executor import InferenceQueueFull, get_executor
+from app.forest import compile_forest
+from app.prediction_log import get_prediction_log
+from app.registry import get_registry
+from app.rules import Rule, RuleSet
 
 router = APIRouter()
 settings = get_settings()
@@ -26,6 +41,13 @@ class CropInput(BaseModel):
     humidity: float = Field(..., ge=0, le=100, description="Average relative humidity (%)")
     ph: float = Field(..., ge=0, le=14, description="Soil pH level")
     rainfall: float = Field(..., ge=0, le=500, description="Average rainfall (mm)")
+    user_id: Optional[UUID] = Field(None, description="Logs the recommendation to crop_logs when set")
+
+
+# Column order the model was trained on
+FEATURE_ORDER = ("nitrogen", "phosphorus", "potassium", "temperature", "humidity", "ph", "rainfall")
+
+TOP_K = 5
 
 
 class CropPrediction(BaseModel):
@@ -161,79 +183,108 @@ DEFAULT_CROP_INFO = {
     "water_requirement": "Varies — check regional guidelines",
 }
 
-# ── Lazy-loaded model ─────────────────────────────────────────
-_model = None
+# ── Model (served from the registry) ──────────────────────────
+def _read_model(path: Path):
+    import joblib
+    model = joblib.load(str(path))
+    if settings.crop_compiled_predictor:
+        model = compile_forest(model, max_rows=settings.crop_compiled_max_rows)
+    return model
 
 
-def _load_model():
-    """Load scikit-learn model lazily."""
-    global _model
-    if _model is not None:
-        return _model
+def _warm(model) -> None:
+    model.predict_proba(np.zeros((1, 7)))
 
-    model_path = settings.crop_model_abs
-    if model_path.exists():
-        try:
-            import joblib
-            _model = joblib.load(str(model_path))
-            return _model
-        except Exception as e:
-            print(f"⚠️  Could not load crop model: {e}")
-            return None
-    else:
-        print(f"⚠️  Crop model not found at {model_path} — using rule-based fallback")
-        return None
 
+get_registry().register("crop", settings.crop_model_abs, _read_model, warm=_warm)
+
+
+def _predict_proba(model, features: np.ndarray) -> np.ndarray:
+    """Class probabilities for a feature matrix (runs on the executor)."""
+    return model.predict_proba(features)
+
+
+def _top_k(probas: np.ndarray, k: int = TOP_K) -> tuple[np.ndarray, np.ndarray]:
+    """Row-wise top-k class indices and probabilities, best first, for all rows at once."""
+    k = min(k, probas.shape[1])
+    top = np.argpartition(probas, -k, axis=1)[:, -k:]
+    top_p = np.take_along_axis(probas, top, axis=1)
+    order = np.argsort(-top_p, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_p, order, axis=1)
+
+
+def _recommendations(classes, top: np.ndarray, top_p: np.ndarray) -> list[dict]:
+    """Enrich one row of top-k predictions with crop info."""
+    results = []
+    for idx, proba in zip(top, top_p):
+        crop_name = str(classes[idx]).lower()
+        info = CROP_INFO.get(crop_name, DEFAULT_CROP_INFO)
+        results.append({
+            "crop": crop_name.capitalize(),
+            "confidence": round(float(proba) * 100, 2),
+            **info,
+        })
+    return results
 
-def _rule_based_recommendation(data: CropInput) -> list[dict]:
-    """Simple rule-based fallback when no ML model is available."""
-    scores: list[tuple[str, float]] = []
 
+# ── Rule-based fallback (compiled once, evaluated per batch) ──
+CROP_RULES = [
     # Rice: high humidity, high rainfall, warm
-    if data.humidity > 70 and data.rainfall > 150 and data.temperature > 20:
-        scores.append(("rice", 0.90))
+    Rule("rice", 0.90, (("humidity", ">", 70), ("rainfall", ">", 150), ("temperature", ">", 20))),
     # Wheat: moderate temp, lower humidity, moderate rainfall
-    if 15 <= data.temperature <= 30 and data.humidity < 70 and data.rainfall < 150:
-        scores.append(("wheat", 0.88))
+    Rule("wheat", 0.88, (("temperature", ">=", 15), ("temperature", "<=", 30),
+                         ("humidity", "<", 70), ("rainfall", "<", 150))),
     # Maize
-    if 18 <= data.temperature <= 35 and data.ph >= 5.5:
-        scores.append(("maize", 0.82))
+    Rule("maize", 0.82, (("temperature", ">=", 18), ("temperature", "<=", 35), ("ph", ">=", 5.5))),
     # Cotton: warm, black soil indicators
-    if data.temperature > 25 and data.potassium > 30:
-        scores.append(("cotton", 0.78))
+    Rule("cotton", 0.78, (("temperature", ">", 25), ("potassium", ">", 30))),
     # Chickpea: cool, dry, low N demand
-    if data.temperature < 30 and data.rainfall < 100 and data.nitrogen < 80:
-        scores.append(("chickpea", 0.80))
+    Rule("chickpea", 0.80, (("temperature", "<", 30), ("rainfall", "<", 100), ("nitrogen", "<", 80))),
     # Banana: tropical, high rain, rich soil
-    if data.temperature > 25 and data.rainfall > 120 and data.nitrogen > 80:
-        scores.append(("banana", 0.77))
+    Rule("banana", 0.77, (("temperature", ">", 25), ("rainfall", ">", 120), ("nitrogen", ">", 80))),
     # Mango
-    if data.temperature > 24 and data.ph >= 5.5 and data.ph <= 7.5:
-        scores.append(("mango", 0.76))
+    Rule("mango", 0.76, (("temperature", ">", 24), ("ph", ">=", 5.5), ("ph", "<=", 7.5))),
     # Lentil
-    if data.temperature < 28 and data.rainfall < 100:
-        scores.append(("lentil", 0.75))
+    Rule("lentil", 0.75, (("temperature", "<", 28), ("rainfall", "<", 100))),
     # Coconut
-    if data.temperature > 27 and data.humidity > 70 and data.rainfall > 150:
-        scores.append(("coconut", 0.74))
+    Rule("coconut", 0.74, (("temperature", ">", 27), ("humidity", ">", 70), ("rainfall", ">", 150))),
     # Pomegranate
-    if data.temperature > 25 and data.rainfall < 80:
-        scores.append(("pomegranate", 0.73))
+    Rule("pomegranate", 0.73, (("temperature", ">", 25), ("rainfall", "<", 80))),
+]
 
-    # Sort by confidence descending, take top 5
-    scores.sort(key=lambda x: x[1], reverse=True)
-    if not scores:
-        scores = [("rice", 0.60), ("wheat", 0.55), ("maize", 0.50)]
+# Used when no rule fires
+DEFAULT_RULE_SCORES = [("rice", 0.60), ("wheat", 0.55), ("maize", 0.50)]
+
+_crop_rules = RuleSet(CROP_RULES, FEATURE_ORDER)
+
+
+def _feature_matrix(rows: list[CropInput]) -> np.ndarray:
+    return np.array(
+        [[getattr(row, name) for name in FEATURE_ORDER] for row in rows],
+        dtype=np.float64,
+    )
+
+
+def _rule_entry(crop_name: str, conf: float) -> dict:
+    info = CROP_INFO.get(crop_name, DEFAULT_CROP_INFO)
+    return {
+        "crop": crop_name.capitalize(),
+        "confidence": round(conf * 100, 2),
+        **info,
+    }
 
-    results = []
-    for crop_name, conf in scores[:5]:
-        info = CROP_INFO.get(crop_name, DEFAULT_CROP_INFO)
-        results.append({
-            "crop": crop_name.capitalize(),
-            "confidence": round(conf * 100, 2),
-            **info,
-        })
-    return results
+
+# Every rule always yields the same entry, so build them once (treat as read-only)
+_RULE_ENTRIES = {(r.label, r.score): _rule_entry(r.label, r.score) for r in CROP_RULES}
+_DEFAULT_RULE_ENTRIES = [_rule_entry(name, conf) for name, conf in DEFAULT_RULE_SCORES]
+
+
+def _rule_based_recommendations(features: np.ndarray) -> list[list[dict]]:
+    """Rule-based fallback for a whole feature matrix when no ML model is available."""
+    return [
+        [_RULE_ENTRIES[hit] for hit in hits] if hits else _DEFAULT_RULE_ENTRIES
+        for hits in _crop_rules.top_k(features, TOP_K)
+    ]
 
 
 # ── Endpoint ──────────────────────────────────────────────────
@@ -242,32 +293,136 @@ async def recommend_crop(data: CropInput):
     """
     Submit soil & climate parameters → get top crop recommendations.
     """
-    model = _load_model()
+    active = await get_registry().aget("crop")
 
-    if model is not None:
+    if active is not None:
         # ── Real prediction ───────────────────────────────────
-        features = np.array([[
-            data.nitrogen, data.phosphorus, data.potassium,
-            data.temperature, data.humidity, data.ph, data.rainfall,
-        ]])
+        features = _feature_matrix([data])
         try:
-            probas = model.predict_proba(features)[0]
-            classes = model.classes_
-            # Top 5 by probability
-            top_indices = np.argsort(probas)[::-1][:5]
-            results = []
-            for idx in top_indices:
-                crop_name = str(classes[idx]).lower()
-                info = CROP_INFO.get(crop_name, DEFAULT_CROP_INFO)
-                results.append({
-                    "crop": crop_name.capitalize(),
-                    "confidence": round(float(probas[idx]) * 100, 2),
-                    **info,
-                })
-            return {"success": True, "recommendations": results}
+            with metrics.span("crop", "inference"):
+                probas = await get_executor().run(_predict_proba, active.model, features)
+            top, top_p = _top_k(probas)
+            results = _recommendations(active.model.classes_, top[0], top_p[0])
+        except InferenceQueueFull:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+        model_version = active.version
     else:
         # ── Rule-based fallback ───────────────────────────────
-        results = _rule_based_recommendation(data)
-        return {"success": True, "recommendations": results}
+        results = _rule_based_recommendations(_feature_matrix([data]))[0]
+        model_version = None
+
+    if data.user_id is not None and settings.prediction_log_enabled:
+        get_prediction_log().record("crop_logs", {
+            "user_id": str(data.user_id),
+            "input_params": data.model_dump(include=set(FEATURE_ORDER)),
+            "recommendations": results,
+        })
+    return {"success": True, "recommendations": results, "model_version": model_version}
+
+
+# ── Batch endpoint ────────────────────────────────────────────
+_batch_adapter = TypeAdapter(list[CropInput])
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Rows serialized per streamed chunk
+STREAM_CHUNK_ROWS = 500
+
+
+def _invalid_row(row: int, e: ValidationError) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail={"row": row, "errors": json.loads(e.json(include_url=False))},
+    )
+
+
+def _parse_batch(body: bytes, content_type: str) -> list[CropInput]:
+    """Parse a JSON array, NDJSON or CSV body into validated rows (runs on the executor)."""
+    if content_type in NDJSON_TYPES:
+        lines = (line for line in body.splitlines() if line.strip())
+        rows = []
+        for i, line in enumerate(lines):
+            try:
+                rows.append(CropInput.model_validate_json(line))
+            except ValidationError as e:
+                raise _invalid_row(i, e)
+        return rows
+
+    if content_type == "text/csv":
+        try:
+            text = body.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV body must be UTF-8 encoded")
+        rows = []
+        try:
+            for i, record in enumerate(csv.DictReader(io.StringIO(text))):
+                try:
+                    rows.append(CropInput.model_validate(record))
+                except ValidationError as e:
+                    raise _invalid_row(i, e)
+        except csv.Error as e:
+            raise HTTPException(status_code=400, detail=f"Malformed CSV: {e}")
+        return rows
+
+    try:
+        return _batch_adapter.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+
+
+def _stream_results(results: Callable[[int], list[dict]], count: int) -> Iterator[bytes]:
+    for start in range(0, count, STREAM_CHUNK_ROWS):
+        lines = [
+            json.dumps({"index": i, "recommendations": results(i)})
+            for i in range(start, min(start + STREAM_CHUNK_ROWS, count))
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+@router.post("/crop/batch")
+async def recommend_crop_batch(request: Request):
+    """
+    Submit many soil tests at once → top crop recommendations per row.
+
+    Body: a JSON array of CropInput objects, NDJSON (one object per line)
+    or CSV with a header row using the CropInput field names.
+    Response: NDJSON stream, one `{"index", "recommendations"}` line per row.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+
+    with metrics.span("crop_batch", "parse"):
+        rows = await get_executor().run(_parse_batch, body, content_type)
+    if not rows:
+        raise HTTPException(status_code=400, detail="No rows submitted.")
+    if len(rows) > settings.crop_batch_max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.crop_batch_max_rows} rows per batch.",
+        )
+
+    headers = {"X-Row-Count": str(len(rows))}
+    features = _feature_matrix(rows)
+    active = await get_registry().aget("crop")
+
+    if active is not None:
+        # ── One vectorized prediction over the whole matrix ───
+        try:
+            with metrics.span("crop_batch", "inference"):
+                probas = await get_executor().run(_predict_proba, active.model, features)
+        except InferenceQueueFull:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+        top, top_p = _top_k(probas)
+        classes = active.model.classes_
+        headers["X-Model-Version"] = active.version
+        stream = _stream_results(lambda i: _recommendations(classes, top[i], top_p[i]), len(rows))
+    else:
+        # ── Vectorized rule-based fallback ────────────────────
+        results = await get_executor().run(_rule_based_recommendations, features)
+        stream = _stream_results(results.__getitem__, len(rows))
+
+    return StreamingResponse(stream, media_type="application/x-ndjson", headers=headers)
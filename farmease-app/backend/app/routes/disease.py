@@ -4,16 +4,31 @@ Disease Detection Endpoint
 POST /predict/disease
 Accepts an image file, runs it through a pre-trained PlantVillage CNN,
 and returns the disease name, confidence, and treatment steps.
+
+POST /predict/disease/jobs, GET /predict/disease/jobs/{job_id}
+The same diagnosis as a queued job: submit returns a job id at once,
+and the client polls (or long-polls with ?wait=) for the result.
 """
 
-import io
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
 
 import numpy as np
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Response
 from PIL import Image
 
+from app import metrics
+from app.backends import load_backend
+from app.batching import MicroBatcher
 from app.config import get_settings
+from app.executor import InferenceQueueFull, get_executor
+from app.ingest import BatchBuffer, StageStats, decode_rgb, resize_uint8, server_timing, stage
+from app.jobs import Job, JobQueue, JobQueueFull
+from app.prediction_log import get_prediction_log
+from app.registry import get_registry
+from app.result_cache import PredictionCache, dhash, digest
 from app.supabase_client import get_supabase
 
 router = APIRouter()
@@ -132,35 +147,75 @@ DEFAULT_TREATMENT = {
     ],
 }
 
-# ── Lazy-loaded model ─────────────────────────────────────────
-_model = None
+# ── Model (served from the registry) ──────────────────────────
+def _read_model(path: Path):
+    return load_backend(settings.disease_backend, path, settings.disease_backend_threads)
 
 
-def _load_model():
-    """Load TensorFlow model lazily on first request."""
-    global _model
-    if _model is not None:
-        return _model
+def _warm(model) -> None:
+    """Run one dummy batch to trigger graph tracing / tensor allocation."""
+    model.predict(np.zeros((1, 224, 224, 3), dtype=np.float32))
+
+
+get_registry().register("disease", settings.disease_backend_model_abs, _read_model, warm=_warm)
 
-    model_path = settings.disease_model_abs
-    if model_path.exists():
-        try:
-            import tensorflow as tf
-            _model = tf.keras.models.load_model(str(model_path))
-            return _model
-        except Exception as e:
-            print(f"⚠️  Could not load disease model: {e}")
-            return None
-    else:
-        print(f"⚠️  Disease model not found at {model_path} — using mock predictions")
-        return None
+
+IMAGE_SIZE = (224, 224)
 
 
 def _preprocess_image(image: Image.Image) -> np.ndarray:
-    """Resize and normalize image for the CNN."""
-    image = image.resize((224, 224))
-    img_array = np.array(image) / 255.0
-    return np.expand_dims(img_array, axis=0)
+    """Resize image for the CNN → uint8 (224, 224, 3); scaled to [0, 1] per batch."""
+    return resize_uint8(image, IMAGE_SIZE)
+
+
+def _decode_image(contents: bytes) -> tuple[np.ndarray, bytes, int, dict[str, float]]:
+    """
+    Decode upload bytes (runs on the executor) → uint8 pixels, their digest
+    and perceptual hash for the result cache, and per-stage timings.
+    """
+    timings: dict[str, float] = {}
+    with stage(timings, "decode"):
+        image = decode_rgb(contents, IMAGE_SIZE)
+    with stage(timings, "resize"):
+        pixels = _preprocess_image(image)
+    with stage(timings, "hash"):
+        pixel_key, phash = digest(pixels.tobytes()), dhash(Image.fromarray(pixels))
+    return pixels, pixel_key, phash, timings
+
+
+def _predict_batch(batch: np.ndarray) -> list[tuple[np.ndarray, str]]:
+    """Run the CNN on a stacked (N, 224, 224, 3) batch → (probs, model version) per row."""
+    active = get_registry().get("disease")
+    probs = active.model.predict(batch)
+    return [(row, active.version) for row in probs]
+
+
+# Concurrent uploads are grouped into one `model.predict` call
+_batcher = MicroBatcher(
+    _predict_batch,
+    max_batch_size=settings.disease_batch_max_size,
+    max_wait_ms=settings.disease_batch_max_wait_ms,
+    max_queue=settings.inference_max_queue,
+    collate=BatchBuffer(settings.disease_batch_max_size, (*IMAGE_SIZE, 3)).fill,
+)
+_stages = StageStats()
+
+# Async mode: uploads queued here are diagnosed by a pool of workers;
+# concurrent workers still share micro-batches
+_jobs = JobQueue(
+    "disease_jobs",
+    workers=settings.disease_jobs_workers,
+    max_queue=settings.disease_jobs_max_queue,
+    ttl_s=settings.disease_jobs_ttl_s,
+    max_jobs=settings.disease_jobs_max_stored,
+)
+
+_results = PredictionCache(
+    max_bytes=int(settings.disease_cache_max_mb * 1024 * 1024),
+    ttl=settings.disease_cache_ttl_s,
+    phash_distance=settings.disease_cache_phash_distance,
+    phash_entries=settings.disease_cache_phash_entries,
+)
 
 
 def _get_treatment(class_name: str) -> dict:
@@ -175,43 +230,95 @@ def _get_treatment(class_name: str) -> dict:
     return info
 
 
-# ── Endpoint ──────────────────────────────────────────────────
-@router.post("/disease")
-async def predict_disease(file: UploadFile = File(...)):
-    """
-    Upload a leaf image → get disease prediction + treatment.
-    Returns JSON with disease name, confidence %, and treatment steps.
-    """
-    # Validate file type
-    if file.content_type not in ("image/jpeg", "image/png", "image/webp"):
-        raise HTTPException(status_code=400, detail="Only JPEG, PNG, or WebP images are accepted.")
+def batcher_stats() -> dict:
+    return _batcher.stats()
 
-    try:
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents)).convert("RGB")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid image file.")
 
-    model = _load_model()
+def cache_stats() -> dict:
+    return _results.stats()
+
+
+def ingest_stats() -> dict:
+    return _stages.stats()
+
+
+def job_stats() -> dict:
+    return _jobs.stats()
+
+
+async def shutdown() -> None:
+    """Stop the job workers and the batch dispatcher (called from the app lifespan)."""
+    await _jobs.stop()
+    await _batcher.stop()
+
+
+# ── Prediction ────────────────────────────────────────────────
+async def _diagnose(
+    read: Callable[[], Awaitable[bytes]], user_id: Optional[UUID]
+) -> tuple[dict, dict[str, float]]:
+    """Read, decode and classify one upload → (response body, stage timings)."""
+    timings: dict[str, float] = {}
+    # Body size is capped upstream by UploadLimitMiddleware
+    with stage(timings, "read"):
+        contents = await read()
+        raw_key = digest(contents)
+    active = await get_registry().aget("disease")
+
+    # Byte-identical re-upload: answer before decoding
+    cached = _results.get_raw(active.version, raw_key) if active is not None else None
 
-    if model is not None:
+    if cached is None:
+        try:
+            img_array, pixel_key, phash, decode_timings = await get_executor().run(
+                _decode_image, contents, kind="process"
+            )
+        except InferenceQueueFull:
+            raise
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid image file.")
+        del contents
+        timings.update(decode_timings)
+
+    if cached is None and active is not None:
+        cached = _results.get_decoded(active.version, pixel_key, phash)
+
+    if cached is not None:
+        class_name, confidence = cached["class"], cached["confidence"]
+        model_version = active.version
+    elif active is not None:
         # ── Real prediction ───────────────────────────────────
-        img_array = _preprocess_image(image)
-        predictions = model.predict(img_array, verbose=0)
-        predicted_idx = int(np.argmax(predictions[0]))
-        confidence = float(predictions[0][predicted_idx])
+        with stage(timings, "infer"):
+            probs, model_version = await _batcher.submit(img_array)
+        predicted_idx = int(np.argmax(probs))
+        confidence = float(probs[predicted_idx])
         class_name = DISEASE_CLASSES[predicted_idx] if predicted_idx < len(DISEASE_CLASSES) else "Unknown"
+        _results.put(model_version, raw_key, pixel_key, phash, {"class": class_name, "confidence": confidence})
     else:
         # ── Mock prediction for demo ──────────────────────────
         import random
         predicted_idx = random.randint(0, len(DISEASE_CLASSES) - 1)
         class_name = DISEASE_CLASSES[predicted_idx]
         confidence = round(random.uniform(0.80, 0.98), 4)
+        model_version = None
+
+    _stages.record(timings)
+    for name, ms in timings.items():
+        metrics.observe_span("disease", name, ms / 1000)
 
     is_healthy = "healthy" in class_name.lower()
     treatment = _get_treatment(class_name)
 
-    return {
+    if user_id is not None and settings.prediction_log_enabled:
+        get_prediction_log().record("disease_logs", {
+            "user_id": str(user_id),
+            "predicted_class": class_name,
+            "disease_name": treatment["disease"],
+            "confidence": round(confidence * 100, 2),
+            "is_healthy": is_healthy,
+            "treatment": None if is_healthy else treatment,
+        })
+
+    body = {
         "success": True,
         "prediction": {
             "class": class_name,
@@ -220,4 +327,97 @@ async def predict_disease(file: UploadFile = File(...)):
             "is_healthy": is_healthy,
         },
         "treatment": None if is_healthy else treatment,
+        "model_version": model_version,
+        "cached": cached is not None,
     }
+    return body, timings
+
+
+def _check_content_type(file: UploadFile) -> None:
+    if file.content_type not in ("image/jpeg", "image/png", "image/webp"):
+        raise HTTPException(status_code=400, detail="Only JPEG, PNG, or WebP images are accepted.")
+
+
+# ── Endpoints ─────────────────────────────────────────────────
+@router.post("/disease")
+async def predict_disease(
+    response: Response,
+    file: UploadFile = File(...),
+    user_id: Optional[UUID] = Form(None, description="Logs the prediction to disease_logs when set"),
+):
+    """
+    Upload a leaf image → get disease prediction + treatment.
+    Returns JSON with disease name, confidence %, and treatment steps.
+    """
+    _check_content_type(file)
+    body, timings = await _diagnose(file.read, user_id)
+    response.headers["Server-Timing"] = server_timing(timings)
+    return body
+
+
+@router.post("/disease/jobs", status_code=202)
+async def submit_disease_job(
+    response: Response,
+    file: UploadFile = File(...),
+    user_id: Optional[UUID] = Form(None, description="Logs the prediction to disease_logs when set"),
+):
+    """
+    Queue a leaf image for diagnosis and return a job id at once.
+    Poll GET /predict/disease/jobs/{job_id} (optionally with ?wait=) for the result.
+    """
+    _check_content_type(file)
+    contents = await file.read()
+
+    async def read() -> bytes:
+        return contents
+
+    async def work() -> dict:
+        body, _ = await _diagnose(read, user_id)
+        return body
+
+    try:
+        job = _jobs.submit(work)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many queued diagnoses, please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    poll_url = f"/predict/disease/jobs/{job.id}"
+    response.headers["Location"] = poll_url
+    return {**_job_body(job), "poll_url": poll_url}
+
+
+@router.get("/disease/jobs/{job_id}")
+async def get_disease_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (long-poll)"),
+):
+    """Status of a diagnosis job, with the result once it is done."""
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    await _jobs.wait(job, min(wait, settings.disease_jobs_max_wait_s))
+    return _job_body(job)
+
+
+def _job_body(job: Job) -> dict:
+    body = {
+        "success": job.status != "failed",
+        "job_id": job.id,
+        "status": job.status,
+        "created_at": _iso(job.created_at),
+    }
+    if job.status == "queued":
+        body["queue_position"] = _jobs.position(job)
+    if job.finished_at is not None:
+        body["finished_at"] = _iso(job.finished_at)
+    if job.status == "done":
+        body["result"] = job.result
+    elif job.status == "failed":
+        body["error"] = job.error
+    return body
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
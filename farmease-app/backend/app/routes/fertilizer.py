@@ -5,10 +5,17 @@ POST /predict/fertilizer
 Accepts soil nutrient levels and crop type, returns fertilizer recommendations.
 """
 
+from pathlib import Path
+
+import numpy as np
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from app import metrics
 from app.config import get_settings
+from app.executor import InferenceQueueFull, get_executor
+from app.registry import get_registry
+from app.rules import range_status
 
 router = APIRouter()
 settings = get_settings()
@@ -111,82 +118,86 @@ CROP_NPK_OPTIMAL: dict[str, tuple[tuple[float, float], tuple[float, float], tupl
 
 DEFAULT_OPTIMAL = ((60, 100), (30, 60), (30, 60))
 
-# ── Lazy-loaded model ─────────────────────────────────────────
-_model = None
+BALANCED_ADVICE = {
+    "fertilizer": "Balanced NPK (10-26-26 or 20-20-0)",
+    "description": "Soil nutrients are within optimal range. Apply balanced maintenance dose.",
+    "advice": [
+        "Apply a low-dose balanced NPK fertilizer",
+        "Supplement with organic compost or vermicompost",
+        "Conduct soil test again before next season",
+    ],
+    "type": "maintain",
+}
 
+# ── Threshold tables for the vectorized rule engine ──────────
+# Row i holds crop i's (N, P, K) × (low, high) bounds; the last row is the default
+_OPTIMAL_INDEX = {crop: i for i, crop in enumerate(CROP_NPK_OPTIMAL)}
+_OPTIMAL_BOUNDS = np.array([*CROP_NPK_OPTIMAL.values(), DEFAULT_OPTIMAL], dtype=np.float64)
 
-def _load_model():
-    global _model
-    if _model is not None:
-        return _model
+# range_status() → -1 / 0 / +1, indexed per nutrient
+_STATUS_ADVICE = [
+    {-1: FERTILIZER_DB["low_N"], 1: FERTILIZER_DB["high_N"]},
+    {-1: FERTILIZER_DB["low_P"], 1: FERTILIZER_DB["high_P"]},
+    {-1: FERTILIZER_DB["low_K"], 1: FERTILIZER_DB["high_K"]},
+]
 
-    model_path = settings.fertilizer_model_abs
-    if model_path.exists():
-        try:
-            import joblib
-            _model = joblib.load(str(model_path))
-            return _model
-        except Exception as e:
-            print(f"⚠️  Could not load fertilizer model: {e}")
-            return None
-    else:
-        print(f"⚠️  Fertilizer model not found at {model_path} — using rule-based fallback")
-        return None
+# ── Model (served from the registry) ──────────────────────────
+def _read_model(path: Path):
+    import joblib
+    return joblib.load(str(path))
 
 
-def _rule_based_advice(data: FertilizerInput) -> dict:
-    """Generate fertilizer advice from simple nutrient thresholds."""
-    crop_key = data.crop_type.lower().strip()
-    optimal = CROP_NPK_OPTIMAL.get(crop_key, DEFAULT_OPTIMAL)
-    n_range, p_range, k_range = optimal
-
-    recommendations = []
-
-    # Nitrogen
-    if data.nitrogen > n_range[1]:
-        recommendations.append(FERTILIZER_DB["high_N"])
-    elif data.nitrogen < n_range[0]:
-        recommendations.append(FERTILIZER_DB["low_N"])
-
-    # Phosphorus
-    if data.phosphorus > p_range[1]:
-        recommendations.append(FERTILIZER_DB["high_P"])
-    elif data.phosphorus < p_range[0]:
-        recommendations.append(FERTILIZER_DB["low_P"])
-
-    # Potassium
-    if data.potassium > k_range[1]:
-        recommendations.append(FERTILIZER_DB["high_K"])
-    elif data.potassium < k_range[0]:
-        recommendations.append(FERTILIZER_DB["low_K"])
-
-    if not recommendations:
-        recommendations.append({
-            "fertilizer": "Balanced NPK (10-26-26 or 20-20-0)",
-            "description": "Soil nutrients are within optimal range. Apply balanced maintenance dose.",
-            "advice": [
-                "Apply a low-dose balanced NPK fertilizer",
-                "Supplement with organic compost or vermicompost",
-                "Conduct soil test again before next season",
-            ],
-            "type": "maintain",
+def _warm(model) -> None:
+    model.predict(np.zeros((1, 7)))
+
+
+get_registry().register("fertilizer", settings.fertilizer_model_abs, _read_model, warm=_warm)
+
+
+def _predict(model, features):
+    """Model prediction for one feature matrix (runs on the executor)."""
+    return model.predict(features)
+
+
+def _crop_key(data: FertilizerInput) -> str:
+    return data.crop_type.lower().strip()
+
+
+def _rule_based_advice_batch(rows: list[FertilizerInput]) -> list[dict]:
+    """Fertilizer advice from nutrient thresholds, evaluated for all rows in one pass."""
+    crop_idx = np.array([_OPTIMAL_INDEX.get(_crop_key(r), len(_OPTIMAL_INDEX)) for r in rows])
+    npk = np.array([[r.nitrogen, r.phosphorus, r.potassium] for r in rows], dtype=np.float64)
+    bounds = _OPTIMAL_BOUNDS[crop_idx]  # (rows, 3, 2)
+    status = range_status(npk, bounds[..., 0], bounds[..., 1])
+
+    results = []
+    for data, row_status in zip(rows, status.tolist()):
+        n_range, p_range, k_range = CROP_NPK_OPTIMAL.get(_crop_key(data), DEFAULT_OPTIMAL)
+        recommendations = [
+            _STATUS_ADVICE[nutrient][s] for nutrient, s in enumerate(row_status) if s
+        ] or [BALANCED_ADVICE]
+
+        results.append({
+            "crop": data.crop_type,
+            "soil_type": data.soil_type,
+            "current_npk": {
+                "nitrogen": data.nitrogen,
+                "phosphorus": data.phosphorus,
+                "potassium": data.potassium,
+            },
+            "optimal_npk": {
+                "nitrogen": list(n_range),
+                "phosphorus": list(p_range),
+                "potassium": list(k_range),
+            },
+            "recommendations": recommendations,
         })
+    return results
+
 
-    return {
-        "crop": data.crop_type,
-        "soil_type": data.soil_type,
-        "current_npk": {
-            "nitrogen": data.nitrogen,
-            "phosphorus": data.phosphorus,
-            "potassium": data.potassium,
-        },
-        "optimal_npk": {
-            "nitrogen": list(n_range),
-            "phosphorus": list(p_range),
-            "potassium": list(k_range),
-        },
-        "recommendations": recommendations,
-    }
+def _rule_based_advice(data: FertilizerInput) -> dict:
+    """Generate fertilizer advice from simple nutrient thresholds."""
+    return _rule_based_advice_batch([data])[0]
 
 
 # ── Endpoint ──────────────────────────────────────────────────
@@ -195,11 +206,10 @@ async def recommend_fertilizer(data: FertilizerInput):
     """
     Submit soil nutrients + crop → get fertilizer recommendations.
     """
-    model = _load_model()
+    active = await get_registry().aget("fertilizer")
 
-    if model is not None:
+    if active is not None:
         try:
-            import numpy as np
             # Encode soil type simply
             soil_types = ["loam", "clay", "sandy", "silt", "peat", "chalk", "red soil", "black soil", "alluvial", "laterite"]
             soil_idx = soil_types.index(data.soil_type.lower()) if data.soil_type.lower() in soil_types else 0
@@ -208,14 +218,18 @@ async def recommend_fertilizer(data: FertilizerInput):
                 data.nitrogen, data.phosphorus, data.potassium,
                 data.temperature, data.humidity, data.moisture, soil_idx,
             ]])
-            prediction = model.predict(features)[0]
+            with metrics.span("fertilizer", "inference"):
+                prediction = (await get_executor().run(_predict, active.model, features))[0]
             return {
                 "success": True,
                 "prediction": str(prediction),
                 "details": _rule_based_advice(data),
+                "model_version": active.version,
             }
+        except InferenceQueueFull:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
     else:
         result = _rule_based_advice(data)
-        return {"success": True, **result}
+        return {"success": True, **result, "model_version": None}
@@ -1,23 +1,69 @@
 """
 Marketplace CRUD Endpoints
 ──────────────────────────
-GET    /api/marketplace/products          — List / search products
+GET    /api/marketplace/products          — List / search / near-me products (cursor or offset paging)
 GET    /api/marketplace/products/{id}     — Get product detail
 POST   /api/marketplace/products          — Create product (farmer)
 PUT    /api/marketplace/products/{id}     — Update product
 DELETE /api/marketplace/products/{id}     — Delete product
+POST   /api/marketplace/products/bulk     — Create many products in one insert
+PATCH  /api/marketplace/products/bulk     — Update many prices / quantities at once
+
+Listing pages and product detail are served through a read-through cache
+(see MARKETPLACE_CACHE_* settings); each write drops the entries it affects.
 """
 
+import asyncio
+import base64
+import json
+import time
 from datetime import datetime
-from typing import Optional
-from uuid import uuid4
+from typing import Any, Awaitable, Iterable, Optional
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, Field
+from postgrest.exceptions import APIError
+from pydantic import BaseModel, Field, ValidationError
 
-from app.supabase_client import get_supabase
+from app import db
+from app.config import get_settings
+from app.db import QueryTimeout
+from app.geo import GeohashIndex
+from app.query_cache import TaggedCache, create_store
 
 router = APIRouter()
+settings = get_settings()
+
+# Pages are tagged with their category filter ("cat:*" when unfiltered) and
+# with every product they contain, detail entries with their product:
+#   create → its category + unfiltered pages
+#   update / delete → pages and detail holding the product, plus its
+#                     (new) category + unfiltered pages it may now enter
+_cache = TaggedCache(
+    create_store(
+        settings.marketplace_cache_redis_url,
+        int(settings.marketplace_cache_max_mb * 1024 * 1024),
+    ),
+    enabled=settings.marketplace_cache_enabled,
+)
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+async def shutdown() -> None:
+    await _cache.aclose()
+
+
+def _listing_tags(category: Optional[str]):
+    def tags(page: dict) -> list[str]:
+        return [f"cat:{category or '*'}"] + [f"product:{p['id']}" for p in page["products"]]
+    return tags
+
+
+async def _invalidate_product(product: dict) -> None:
+    await _cache.invalidate(f"product:{product['id']}", f"cat:{product['category']}", "cat:*")
 
 
 # ── Schemas ───────────────────────────────────────────────────
@@ -32,6 +78,8 @@ class ProductCreate(BaseModel):
     image_url: Optional[str] = None
     seller_id: str = Field(..., description="User ID of the farmer")
     location: Optional[str] = None
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class ProductUpdate(BaseModel):
@@ -43,67 +91,438 @@ class ProductUpdate(BaseModel):
     category: Optional[str] = None
     image_url: Optional[str] = None
     location: Optional[str] = None
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
     is_available: Optional[bool] = None
 
 
+class ProductPatch(BaseModel):
+    id: UUID
+    price: Optional[float] = Field(None, gt=0)
+    quantity: Optional[float] = Field(None, ge=0)
+
+
+# Bulk items are validated one by one so a bad lot is reported in its
+# result instead of rejecting the whole submission
+class BulkCreate(BaseModel):
+    products: list[dict[str, Any]] = Field(..., min_length=1, max_length=settings.marketplace_bulk_max_items)
+
+
+class BulkPatch(BaseModel):
+    updates: list[dict[str, Any]] = Field(..., min_length=1, max_length=settings.marketplace_bulk_max_items)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+# ── Cursors ───────────────────────────────────────────────────
+# Opaque to clients: base64url JSON. Listings are ordered newest first by
+# (created_at, id) and the cursor is the last row's key, so the next page
+# is an index range scan (idx_products_listing) however deep it is.
+# Ranked search and near-me results have no such key; their cursor is the
+# next offset.
+
+def _encode_cursor(key: list) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        key = None
+    if not isinstance(key, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def _after_cursor(query, cursor: str):
+    """Rows strictly after the cursor in (created_at DESC, id DESC) order."""
+    key = _decode_cursor(cursor)
+    try:
+        created_at, product_id = key
+        datetime.fromisoformat(created_at)
+        UUID(product_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Quoted: timestamps contain ':' and '+', which PostgREST reserves in or=()
+    return query.or_(
+        f'created_at.lt."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.lt.{product_id})'
+    )
+
+
+def _offset_cursor(cursor: str) -> int:
+    key = _decode_cursor(cursor)
+    if len(key) != 1 or not isinstance(key[0], int) or key[0] < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key[0]
+
+
+# ── Optional database functions ───────────────────────────────
+class _RpcProbe:
+    """Whether a function from supabase_schema.sql is deployed.
+
+    Only PostgREST's "function not found" (PGRST202) marks it missing, and
+    then only for MARKETPLACE_RPC_RETRY_S: the next call after that tries
+    it again. Any other error is the caller's to handle.
+    """
+
+    def __init__(self, name: str, fallback: str):
+        self.name = name
+        self.fallback = fallback
+        self._retry_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def missing(self, e: APIError) -> bool:
+        """True if `e` says the function isn't deployed (it's then skipped until the retry)."""
+        if e.code != "PGRST202":
+            return False
+        if self._retry_at == 0.0:
+            print(f"⚠️  {self.name}() is not deployed — {self.fallback}")
+        self._retry_at = time.monotonic() + settings.marketplace_rpc_retry_s
+        return True
+
+
+# ── Search ────────────────────────────────────────────────────
+# Until the search_products() function from supabase_schema.sql is
+# deployed, search falls back to the old ILIKE filter on the name
+_search_rpc = _RpcProbe("search_products", "falling back to ILIKE search")
+
+
+async def _search_products(
+    search: str,
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    seller_id: Optional[str],
+    limit: int,
+    offset: int,
+) -> Optional[dict]:
+    """Ranked full-text + trigram search; None if the database lacks the function."""
+    params = {
+        "q": search,
+        "filter_category": category,
+        "min_price": min_price,
+        "max_price": max_price,
+        "filter_seller": seller_id,
+        "result_limit": limit + 1,
+        "result_offset": offset,
+    }
+    try:
+        result = await db.execute(db.get_db().rpc("search_products", params), "products.search")
+    except APIError as e:
+        if not _search_rpc.missing(e):
+            raise
+        return None
+
+    products = result.data[:limit]
+    next_cursor = _encode_cursor([offset + limit]) if len(result.data) > limit else None
+    return {"success": True, "products": products, "count": len(products), "next_cursor": next_cursor}
+
+
+# ── Near me ───────────────────────────────────────────────────
+# PostGIS does the work when nearby_products() is deployed; otherwise (or
+# with MARKETPLACE_GEO_BACKEND=local) this worker keeps a geohash index of
+# every located product, patched by this worker's own writes. Every
+# MARKETPLACE_GEO_INDEX_REFRESH_S it is rebuilt by a background task while
+# requests keep using the previous snapshot; only the first load is waited on.
+_geo_rpc = _RpcProbe("nearby_products", "using the in-process geohash index")
+_geo_index: Optional[GeohashIndex] = None
+_geo_refresh_due = 0.0
+_geo_refresh: Optional[asyncio.Task] = None
+_geo_pending: Optional[list[dict]] = None  # writes made while a rebuild runs
+_geo_lock = asyncio.Lock()
+_GEO_RETRY_S = 30.0
+_GEO_PAGE = 1000
+
+
+async def _nearby_products(
+    lat: float,
+    lon: float,
+    radius_km: Optional[float],
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    seller_id: Optional[str],
+    limit: int,
+    offset: int,
+) -> dict:
+    use_rpc = settings.marketplace_geo_backend == "postgis" and _geo_rpc.available
+    if use_rpc:
+        params = {
+            "origin_lat": lat,
+            "origin_lon": lon,
+            "radius_km": radius_km,
+            "filter_category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "filter_seller": seller_id,
+            "result_limit": limit + 1,
+            "result_offset": offset,
+        }
+        try:
+            result = await db.execute(db.get_db().rpc("nearby_products", params), "products.nearby")
+            rows, more = result.data[:limit], len(result.data) > limit
+        except APIError as e:
+            if not _geo_rpc.missing(e):
+                raise
+            use_rpc = False
+    if not use_rpc:
+        rows, more = await _nearby_local(lat, lon, radius_km, category, min_price, max_price, seller_id, limit, offset)
+
+    next_cursor = _encode_cursor([offset + limit]) if more else None
+    return {"success": True, "products": rows, "count": len(rows), "next_cursor": next_cursor}
+
+
+async def _nearby_local(lat, lon, radius_km, category, min_price, max_price, seller_id, limit, offset):
+    def matches(p: dict) -> bool:
+        return (
+            (category is None or p["category"] == category)
+            and (min_price is None or p["price"] >= min_price)
+            and (max_price is None or p["price"] <= max_price)
+            and (seller_id is None or p["seller_id"] == seller_id)
+        )
+
+    index = await _load_geo_index()
+    hits = index.nearest(lat, lon, offset + limit + 1, radius_km=radius_km, where=matches)
+    page = hits[offset:offset + limit]
+    if not page:
+        return [], False
+
+    query = (
+        db.table("products")
+        .select("*, users!seller_id(name, phone, avatar_url)")
+        .in_("id", [key for _, key, _ in page])
+        .eq("is_available", True)
+    )
+    found = {row["id"]: row for row in (await db.execute(query, "products.nearby_rows")).data}
+    rows = [
+        {**found[key], "distance_km": round(distance, 3)}
+        for distance, key, _ in page if key in found
+    ]
+    return rows, len(hits) > offset + limit
+
+
+async def _load_geo_index() -> GeohashIndex:
+    """This worker's index of available, located products; a stale one is refreshed in the background."""
+    global _geo_refresh
+
+    if _geo_index is None:
+        async with _geo_lock:
+            if _geo_index is None:
+                await _rebuild_geo_index()
+    elif time.monotonic() >= _geo_refresh_due and (_geo_refresh is None or _geo_refresh.done()):
+        _geo_refresh = asyncio.create_task(_refresh_geo_index())
+    return _geo_index
+
+
+async def _refresh_geo_index() -> None:
+    async with _geo_lock:
+        try:
+            await _rebuild_geo_index()
+        except Exception as e:
+            print(f"⚠️  Could not refresh the geo index, serving the previous one: {e}")
+
+
+async def _rebuild_geo_index() -> None:
+    """Read every located product into a new index and swap it in (call under `_geo_lock`)."""
+    global _geo_index, _geo_refresh_due, _geo_pending
+
+    _geo_pending = []
+    try:
+        index, last_id = GeohashIndex(), None
+        while True:
+            query = (
+                db.table("products")
+                .select("id, lat, lon, category, price, seller_id, is_available")
+                .eq("is_available", True)
+                .not_.is_("lat", "null")
+                .not_.is_("lon", "null")
+                .order("id")
+                .limit(_GEO_PAGE)
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = (await db.execute(query, "products.geo_index")).data
+            for row in rows:
+                _geo_add(index, row)
+            if len(rows) < _GEO_PAGE:
+                break
+            last_id = rows[-1]["id"]
+        # Replay writes the pages read earlier may have missed
+        for row in _geo_pending:
+            _geo_add(index, row)
+        _geo_index = index
+        _geo_refresh_due = time.monotonic() + settings.marketplace_geo_index_refresh_s
+    except Exception:
+        _geo_refresh_due = time.monotonic() + min(_GEO_RETRY_S, settings.marketplace_geo_index_refresh_s)
+        raise
+    finally:
+        _geo_pending = None
+
+
+def _geo_add(index: GeohashIndex, row: dict) -> None:
+    if row.get("is_available", True) and row.get("lat") is not None and row.get("lon") is not None:
+        index.add(row["id"], row["lat"], row["lon"], {
+            "category": row["category"],
+            "price": float(row["price"]),
+            "seller_id": row["seller_id"],
+        })
+    else:
+        index.remove(row["id"])
+
+
+def _geo_track(rows: list[dict]) -> None:
+    """Apply this worker's writes to its geohash index, if one is loaded (or loading)."""
+    if _geo_pending is not None:
+        _geo_pending.extend(rows)
+    if _geo_index is not None:
+        for row in rows:
+            _geo_add(_geo_index, row)
+
+
 # ── List / Search ─────────────────────────────────────────────
 
 @router.get("/marketplace/products")
 async def list_products(
     category: Optional[str] = Query(None, description="Filter by category"),
-    search: Optional[str] = Query(None, description="Search by name"),
+    search: Optional[str] = Query(None, description="Search name, category and description (best match first)"),
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     seller_id: Optional[str] = Query(None, description="Filter by seller"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Buyer latitude: nearest products first"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Buyer longitude"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only products within this distance of lat/lon"),
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Legacy offset paging; prefer cursor"),
 ):
-    """List marketplace products with optional filters."""
-    sb = get_supabase()
-
+    """List marketplace products with optional filters, newest first (by relevance when searching, by distance given lat/lon)."""
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="lat and lon must be given together")
+    if radius_km is not None and lat is None:
+        raise HTTPException(status_code=400, detail="radius_km needs lat and lon")
+    if lat is not None and search:
+        raise HTTPException(status_code=400, detail="search can't be combined with lat/lon")
+    if category and category.lower() == "all":
+        category = None
+
+    # Search is case- and whitespace-insensitive; normalize so equivalent
+    # queries share a cache entry
+    if search:
+        search = " ".join(search.lower().split()) or None
+
+    key = "list:" + json.dumps(
+        [category, search, min_price, max_price, seller_id, lat, lon, radius_km, limit, cursor, offset],
+        separators=(",", ":"),
+    )
+    near = (lat, lon, radius_km) if lat is not None else None
     try:
-        query = sb.table("products").select(
-            "*, users!seller_id(name, phone, avatar_url)"
-        ).eq("is_available", True)
-
-        if category and category.lower() != "all":
-            query = query.eq("category", category)
-        if search:
-            query = query.ilike("name", f"%{search}%")
-        if min_price is not None:
-            query = query.gte("price", min_price)
-        if max_price is not None:
-            query = query.lte("price", max_price)
-        if seller_id:
-            query = query.eq("seller_id", seller_id)
-
-        query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-        result = query.execute()
-
-        return {"success": True, "products": result.data, "count": len(result.data)}
+        return await _cache.get_or_fetch(
+            key,
+            lambda: _query_products(category, search, min_price, max_price, seller_id, near, limit, cursor, offset),
+            ttl=settings.marketplace_cache_listing_ttl_s,
+            tags=_listing_tags(category),
+        )
+    except (HTTPException, QueryTimeout):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+async def _query_products(
+    category: Optional[str],
+    search: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    seller_id: Optional[str],
+    near: Optional[tuple[float, float, Optional[float]]],
+    limit: int,
+    cursor: Optional[str],
+    offset: int,
+) -> dict:
+    if near is not None:
+        return await _nearby_products(
+            *near, category, min_price, max_price, seller_id, limit,
+            _offset_cursor(cursor) if cursor else offset,
+        )
+
+    if search and _search_rpc.available:
+        page = await _search_products(
+            search, category, min_price, max_price, seller_id, limit,
+            _offset_cursor(cursor) if cursor else offset,
+        )
+        if page is not None:
+            return page
+
+    query = db.table("products").select(
+        "*, users!seller_id(name, phone, avatar_url)"
+    ).eq("is_available", True)
+
+    if category:
+        query = query.eq("category", category)
+    if search:
+        query = query.ilike("name", f"%{search}%")
+    if min_price is not None:
+        query = query.gte("price", min_price)
+    if max_price is not None:
+        query = query.lte("price", max_price)
+    if seller_id:
+        query = query.eq("seller_id", seller_id)
+
+    # One order param for both keys → "created_at.desc,id.desc" (this
+    # postgrest-py version emits a separate order= per .order() call)
+    query = query.order("created_at.desc,id", desc=True)
+    # One extra row tells us whether another page exists
+    if cursor:
+        query = _after_cursor(query, cursor).limit(limit + 1)
+    else:
+        query = query.range(offset, offset + limit)
+    result = await db.execute(query, "products.list")
+
+    products = result.data[:limit]
+    next_cursor = (
+        _encode_cursor([products[-1]["created_at"], products[-1]["id"]])
+        if len(result.data) > limit else None
+    )
+    return {"success": True, "products": products, "count": len(products), "next_cursor": next_cursor}
+
+
 # ── Get single product ───────────────────────────────────────
 
 @router.get("/marketplace/products/{product_id}")
 async def get_product(product_id: str):
     """Get a single product by ID with seller info."""
-    sb = get_supabase()
-
-    try:
-        result = (
-            sb.table("products")
+    async def fetch() -> dict:
+        query = (
+            db.table("products")
             .select("*, users!seller_id(name, phone, avatar_url, farm_location)")
             .eq("id", product_id)
-            .single()
-            .execute()
+            .limit(1)
         )
+        result = await db.execute(query, "products.get")
         if not result.data:
             raise HTTPException(status_code=404, detail="Product not found")
-        return {"success": True, "product": result.data}
-    except HTTPException:
+        return {"success": True, "product": result.data[0]}
+
+    try:
+        return await _cache.get_or_fetch(
+            f"product:{product_id}",
+            fetch,
+            ttl=settings.marketplace_cache_product_ttl_s,
+            tags=lambda _: [f"product:{product_id}"],
+        )
+    except (HTTPException, QueryTimeout):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -114,9 +533,21 @@ async def get_product(product_id: str):
 @router.post("/marketplace/products", status_code=201)
 async def create_product(product: ProductCreate):
     """Create a new marketplace listing (for farmers)."""
-    sb = get_supabase()
+    row = _new_row(product)
+
+    try:
+        result = await db.execute(db.table("products").insert(row), "products.create")
+        await _cache.invalidate(f"cat:{product.category}", "cat:*")
+        _geo_track([row])
+        return {"success": True, "product": result.data[0] if result.data else row}
+    except QueryTimeout:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not create product: {str(e)}")
+
 
-    row = {
+def _new_row(product: ProductCreate) -> dict:
+    return {
         "id": str(uuid4()),
         "name": product.name,
         "description": product.description,
@@ -127,25 +558,19 @@ async def create_product(product: ProductCreate):
         "image_url": product.image_url,
         "seller_id": product.seller_id,
         "location": product.location,
+        "lat": product.lat,
+        "lon": product.lon,
         "is_available": True,
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat(),
     }
 
-    try:
-        result = sb.table("products").insert(row).execute()
-        return {"success": True, "product": result.data[0] if result.data else row}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Could not create product: {str(e)}")
-
 
 # ── Update product ───────────────────────────────────────────
 
 @router.put("/marketplace/products/{product_id}")
 async def update_product(product_id: str, updates: ProductUpdate):
     """Update a product listing."""
-    sb = get_supabase()
-
     update_data = {k: v for k, v in updates.model_dump().items() if v is not None}
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
@@ -153,16 +578,14 @@ async def update_product(product_id: str, updates: ProductUpdate):
     update_data["updated_at"] = datetime.utcnow().isoformat()
 
     try:
-        result = (
-            sb.table("products")
-            .update(update_data)
-            .eq("id", product_id)
-            .execute()
-        )
+        query = db.table("products").update(update_data).eq("id", product_id)
+        result = await db.execute(query, "products.update")
         if not result.data:
             raise HTTPException(status_code=404, detail="Product not found")
+        await _invalidate_product(result.data[0])
+        _geo_track(result.data)
         return {"success": True, "product": result.data[0]}
-    except HTTPException:
+    except (HTTPException, QueryTimeout):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not update product: {str(e)}")
@@ -173,19 +596,183 @@ async def update_product(product_id: str, updates: ProductUpdate):
 @router.delete("/marketplace/products/{product_id}")
 async def delete_product(product_id: str):
     """Soft-delete a product (marks as unavailable)."""
-    sb = get_supabase()
-
     try:
-        result = (
-            sb.table("products")
+        query = (
+            db.table("products")
             .update({"is_available": False, "updated_at": datetime.utcnow().isoformat()})
             .eq("id", product_id)
-            .execute()
         )
+        result = await db.execute(query, "products.delete")
         if not result.data:
             raise HTTPException(status_code=404, detail="Product not found")
+        await _invalidate_product(result.data[0])
+        _geo_track(result.data)
         return {"success": True, "message": "Product removed from marketplace"}
-    except HTTPException:
+    except (HTTPException, QueryTimeout):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not delete product: {str(e)}")
+
+
+# ── Bulk create / update ─────────────────────────────────────
+# One request and one database round trip for a cooperative's whole list.
+# Results come back per item, in submission order:
+#   {"index": i, "success": true, "product": {...}}
+#   {"index": i, "success": false, "error": "..."}
+
+@router.post("/marketplace/products/bulk")
+async def bulk_create_products(body: BulkCreate):
+    """Create many listings with a single multi-row insert."""
+    results: list[Optional[dict]] = [None] * len(body.products)
+    rows: dict[int, dict] = {}
+    for index, item in enumerate(body.products):
+        try:
+            rows[index] = _new_row(ProductCreate.model_validate(item))
+        except ValidationError as e:
+            results[index] = {"index": index, "success": False, "error": _validation_message(e)}
+
+    if rows:
+        try:
+            try:
+                result = await db.execute(db.table("products").insert(list(rows.values())), "products.bulk_create")
+            except APIError:
+                # The database refused the batch (e.g. an unknown seller_id);
+                # insert the rows one by one to find out which
+                result = None
+            except QueryTimeout:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Could not create products: {str(e)}")
+
+            if result is not None:
+                created = {row["id"]: row for row in result.data}
+                for index, row in rows.items():
+                    results[index] = {"index": index, "success": True, "product": created.get(row["id"], row)}
+            else:
+                async def salvage(index: int, row: dict) -> None:
+                    results[index] = await _insert_one(index, row)
+
+                await _bounded_gather(salvage(index, row) for index, row in rows.items())
+        finally:
+            # Runs even if the request fails part-way: rows may already be
+            # written (or, after a timeout, may have been)
+            categories = {row["category"] for row in rows.values()}
+            await _cache.invalidate(*(f"cat:{c}" for c in categories), "cat:*")
+            _geo_track([item["product"] for item in results if item and item["success"]])
+
+    return _bulk_response(results)
+
+
+# Per-row fallbacks share the connection pool with every other request
+_FALLBACK_CONCURRENCY = max(1, settings.db_max_connections // 2)
+
+
+async def _bounded_gather(coros: Iterable[Awaitable[Any]]) -> list[Any]:
+    """gather() with at most _FALLBACK_CONCURRENCY queries in flight."""
+    semaphore = asyncio.Semaphore(_FALLBACK_CONCURRENCY)
+
+    async def bounded(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(bounded(coro) for coro in coros))
+
+
+async def _insert_one(index: int, row: dict) -> dict:
+    try:
+        result = await db.execute(db.table("products").insert(row), "products.create")
+    except APIError as e:
+        return {"index": index, "success": False, "error": e.message}
+    except QueryTimeout:
+        return {"index": index, "success": False, "error": "Timed out; the product may have been created"}
+    return {"index": index, "success": True, "product": result.data[0] if result.data else row}
+
+
+# bulk_update_products() from supabase_schema.sql applies every patch in
+# one UPDATE; until it is deployed, patches run as single updates (bounded
+# concurrency)
+_bulk_rpc = _RpcProbe("bulk_update_products", "updating products one by one")
+
+
+@router.patch("/marketplace/products/bulk")
+async def bulk_update_products(body: BulkPatch):
+    """Update the price and/or quantity of many listings at once."""
+    results: list[Optional[dict]] = [None] * len(body.updates)
+    patches: dict[int, dict] = {}
+    seen: set[str] = set()
+    for index, item in enumerate(body.updates):
+        try:
+            patch = ProductPatch.model_validate(item).model_dump(exclude_none=True, mode="json")
+        except ValidationError as e:
+            results[index] = {"index": index, "success": False, "error": _validation_message(e)}
+            continue
+        if len(patch) == 1:
+            results[index] = {"index": index, "success": False, "error": "No fields to update"}
+        elif patch["id"] in seen:
+            results[index] = {"index": index, "success": False, "error": "Duplicate product id"}
+        else:
+            seen.add(patch["id"])
+            patches[index] = patch
+
+    if patches:
+        updated: dict[str, dict] = {}
+        try:
+            rows = None
+            if _bulk_rpc.available:
+                rows = await _bulk_update_rpc(list(patches.values()))
+            updated = rows if rows is not None else await _bulk_update_each(list(patches.values()))
+        except QueryTimeout:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Could not update products: {str(e)}")
+        finally:
+            # Some updates may have committed even if the call failed
+            await _cache.invalidate(
+                *(f"product:{patch['id']}" for patch in patches.values()),
+                *{f"cat:{row['category']}" for row in updated.values()},
+                "cat:*",
+            )
+            _geo_track(list(updated.values()))
+
+        for index, patch in patches.items():
+            row = updated.get(patch["id"])
+            results[index] = (
+                {"index": index, "success": True, "product": row} if row is not None
+                else {"index": index, "success": False, "error": "Product not found"}
+            )
+
+    return _bulk_response(results)
+
+
+async def _bulk_update_rpc(patches: list[dict]) -> Optional[dict[str, dict]]:
+    """Updated rows by id, or None if the database lacks bulk_update_products()."""
+    try:
+        result = await db.execute(
+            db.get_db().rpc("bulk_update_products", {"items": patches}), "products.bulk_update"
+        )
+    except APIError as e:
+        if not _bulk_rpc.missing(e):
+            raise
+        return None
+    return {row["id"]: row for row in result.data}
+
+
+async def _bulk_update_each(patches: list[dict]) -> dict[str, dict]:
+    async def update(patch: dict) -> list[dict]:
+        fields = {k: v for k, v in patch.items() if k != "id"}
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        query = db.table("products").update(fields).eq("id", patch["id"])
+        return (await db.execute(query, "products.update")).data
+
+    updated = await _bounded_gather(update(patch) for patch in patches)
+    return {row["id"]: row for rows in updated for row in rows}
+
+
+def _bulk_response(results: list[dict]) -> dict:
+    succeeded = sum(1 for item in results if item["success"])
+    return {
+        "success": succeeded == len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
@@ -0,0 +1,71 @@
+"""
+Model Registry Endpoints
+────────────────────────
+GET  /models                   — Active + previous versions of every model
+POST /models/{name}/reload     — Load the file on disk as a new version now
+POST /models/{name}/rollback   — Re-activate the previous version
+
+The two POST actions need MODELS_ADMIN_TOKEN in the X-Admin-Token header
+and are disabled while it is unset. They change only the worker process
+that handles the request (its pid is in the response); to update every
+worker, replace the model file and let the watcher pick it up, or restart.
+"""
+
+import asyncio
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.config import get_settings
+from app.registry import get_registry
+
+router = APIRouter()
+settings = get_settings()
+
+
+def _check_name(name: str) -> None:
+    if name not in get_registry().names():
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'")
+
+
+def _check_admin(token: Optional[str]) -> None:
+    if not settings.models_admin_token:
+        raise HTTPException(status_code=403, detail="Model admin actions are disabled (MODELS_ADMIN_TOKEN is not set)")
+    if token is None or not hmac.compare_digest(token.encode(), settings.models_admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Token")
+
+
+@router.get("/models")
+async def list_models():
+    """Show which version of each model is serving traffic."""
+    return {"success": True, "models": get_registry().info()}
+
+
+@router.post("/models/{name}/reload")
+async def reload_model(name: str, x_admin_token: Optional[str] = Header(None)):
+    """Load the current model file as a new version and swap it in (this worker only)."""
+    _check_admin(x_admin_token)
+    _check_name(name)
+    registry = get_registry()
+    active = await asyncio.to_thread(registry.reload, name)
+    if active is None:
+        info = registry.info()[name]
+        if not os.path.exists(info["path"]):
+            raise HTTPException(status_code=409, detail=f"No {name} model file on disk")
+        version = info["active"]["version"] if info["active"] else "the fallback"
+        raise HTTPException(status_code=500, detail=f"Could not load the {name} model file; still serving {version}")
+    return {"success": True, "model": name, "active": active.info(), "worker": os.getpid()}
+
+
+@router.post("/models/{name}/rollback")
+async def rollback_model(name: str, x_admin_token: Optional[str] = Header(None)):
+    """Instantly switch back to the previously active version (this worker only)."""
+    _check_admin(x_admin_token)
+    _check_name(name)
+    # Waits on the slot lock, which a reload may hold for seconds
+    active = await asyncio.to_thread(get_registry().rollback, name)
+    if active is None:
+        raise HTTPException(status_code=409, detail=f"No previous {name} version to roll back to")
+    return {"success": True, "model": name, "active": active.info(), "worker": os.getpid()}
@@ -5,11 +5,16 @@ GET  /api/weather?lat=...&lon=...
 GET  /api/weather/forecast?lat=...&lon=...
 
 Proxies OpenWeatherMap API so the mobile app doesn't expose the API key.
+Responses are cached per lat/lon grid cell (see WEATHER_CACHE_* settings).
 """
 
+from typing import Literal
+
 import httpx
 from fastapi import APIRouter, HTTPException, Query
 
+from app import http_client
+from app.cache import TTLCache
 from app.config import get_settings
 
 router = APIRouter()
@@ -17,12 +22,60 @@ settings = get_settings()
 
 OWM_BASE = "https://api.openweathermap.org/data/2.5"
 
+# OpenWeatherMap's unit systems; anything else is a 422, not a cache entry
+Units = Literal["metric", "imperial", "standard"]
+
+# Farmers in the same district share cached responses: coordinates are
+# snapped to a grid cell and the upstream is queried at the cell centre.
+_cache = TTLCache(max_bytes=int(settings.weather_cache_max_mb * 1024 * 1024))
+
+
+def _grid_cell(lat: float, lon: float) -> tuple[int, int]:
+    step = settings.weather_cache_grid_deg
+    return round(lat / step), round(lon / step)
+
+
+async def _fetch_owm(endpoint: str, lat: float, lon: float, units: Units, label: str) -> dict:
+    try:
+        resp = await http_client.request(
+            "GET",
+            f"{OWM_BASE}/{endpoint}",
+            params={
+                "lat": lat,
+                "lon": lon,
+                "appid": settings.openweather_api_key,
+                "units": units,
+            },
+        )
+        resp.raise_for_status()
+        return resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"{label} API error")
+    except httpx.RequestError:
+        raise HTTPException(status_code=503, detail=f"{label} service unavailable")
+
+
+async def _cached_owm(endpoint: str, lat: float, lon: float, units: Units, label: str, ttl: float) -> dict:
+    cell = _grid_cell(lat, lon)
+    step = settings.weather_cache_grid_deg
+    center_lat, center_lon = round(cell[0] * step, 6), round(cell[1] * step, 6)
+    return await _cache.get_or_fetch(
+        (endpoint, cell, units),
+        lambda: _fetch_owm(endpoint, center_lat, center_lon, units, label),
+        ttl=ttl,
+        stale_ttl=settings.weather_cache_stale_s,
+    )
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
 
 @router.get("/weather")
 async def get_current_weather(
     lat: float = Query(..., description="Latitude"),
     lon: float = Query(..., description="Longitude"),
-    units: str = Query("metric", description="Units: metric / imperial"),
+    units: Units = Query("metric", description="Units: metric / imperial / standard"),
 ):
     """Get current weather for a location (proxies OpenWeatherMap)."""
     api_key = settings.openweather_api_key
@@ -31,30 +84,14 @@ async def get_current_weather(
         # Return demo data when no key is set
         return _mock_current_weather(lat, lon)
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(
-                f"{OWM_BASE}/weather",
-                params={
-                    "lat": lat,
-                    "lon": lon,
-                    "appid": api_key,
-                    "units": units,
-                },
-            )
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail="Weather API error")
-        except httpx.RequestError:
-            raise HTTPException(status_code=503, detail="Weather service unavailable")
+    return await _cached_owm("weather", lat, lon, units, "Weather", settings.weather_cache_ttl_s)
 
 
 @router.get("/weather/forecast")
 async def get_forecast(
     lat: float = Query(..., description="Latitude"),
     lon: float = Query(..., description="Longitude"),
-    units: str = Query("metric", description="Units: metric / imperial"),
+    units: Units = Query("metric", description="Units: metric / imperial / standard"),
 ):
     """Get 5-day / 3-hour forecast (proxies OpenWeatherMap)."""
     api_key = settings.openweather_api_key
@@ -62,23 +99,7 @@ async def get_forecast(
     if api_key == "your-openweathermap-api-key":
         return _mock_forecast(lat, lon)
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(
-                f"{OWM_BASE}/forecast",
-                params={
-                    "lat": lat,
-                    "lon": lon,
-                    "appid": api_key,
-                    "units": units,
-                },
-            )
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail="Forecast API error")
-        except httpx.RequestError:
-            raise HTTPException(status_code=503, detail="Forecast service unavailable")
+    return await _cached_owm("forecast", lat, lon, units, "Forecast", settings.forecast_cache_ttl_s)
 
 
 # ── Mock data for demo ────────────────────────────────────────
@@ -0,0 +1,79 @@
+"""
+FarmEase Backend — Vectorized Rule Engine
+─────────────────────────────────────────
+Table-driven replacement for hand-written `if` chains. Rules are compiled
+once into NumPy bound arrays and evaluated for a whole batch of inputs in
+a single pass, so the no-model fallbacks scale to bulk traffic.
+
+A rule is a label, a score and a list of (feature, op, value) conditions
+that must all hold, e.g. ("humidity", ">", 70).
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+Condition = tuple[str, str, float]
+
+_OPS = (">", ">=", "<", "<=")
+
+
+@dataclass(frozen=True)
+class Rule:
+    label: str
+    score: float
+    conditions: tuple[Condition, ...]
+
+
+class RuleSet:
+    """Rules compiled into per-feature [lo, hi] bounds: shape (rules, features)."""
+
+    def __init__(self, rules: Sequence[Rule], features: Sequence[str]):
+        # Highest score first; stable, so equal scores keep declaration order
+        self.rules = sorted(rules, key=lambda r: -r.score)
+        self.features = tuple(features)
+        self.labels = [r.label for r in self.rules]
+        self.scores = np.array([r.score for r in self.rules], dtype=np.float64)
+
+        column = {name: i for i, name in enumerate(self.features)}
+        self.lo = np.full((len(self.rules), len(self.features)), -np.inf)
+        self.hi = np.full((len(self.rules), len(self.features)), np.inf)
+
+        for r, rule in enumerate(self.rules):
+            for feature, op, value in rule.conditions:
+                if op not in _OPS:
+                    raise ValueError(f"Unsupported operator {op!r} in rule {rule.label!r}")
+                f = column[feature]
+                # Strict bounds become inclusive ones one float step inside,
+                # so evaluation is just lo <= x <= hi
+                if op == ">":
+                    self.lo[r, f] = max(self.lo[r, f], np.nextafter(value, np.inf))
+                elif op == ">=":
+                    self.lo[r, f] = max(self.lo[r, f], value)
+                elif op == "<":
+                    self.hi[r, f] = min(self.hi[r, f], np.nextafter(value, -np.inf))
+                else:
+                    self.hi[r, f] = min(self.hi[r, f], value)
+
+    def match(self, X: np.ndarray) -> np.ndarray:
+        """Boolean (rows, rules) matrix: does each rule fire for each input row?"""
+        X = np.asarray(X, dtype=np.float64)[:, None, :]
+        return ((X >= self.lo) & (X <= self.hi)).all(axis=2)
+
+    def top_k(self, X: np.ndarray, k: int) -> list[list[tuple[str, float]]]:
+        """Best `k` firing rules per row as (label, score), highest score first."""
+        fired = self.match(X)
+        # Rules are score-sorted, so the first k hits in each row are its top k
+        fired &= np.cumsum(fired, axis=1) <= k
+        rows, cols = np.nonzero(fired)
+        splits = np.cumsum(np.bincount(rows, minlength=len(fired)))[:-1]
+        return [
+            [(self.labels[c], float(self.scores[c])) for c in row_cols]
+            for row_cols in np.split(cols, splits)
+        ]
+
+
+def range_status(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Element-wise -1 / 0 / +1 for below / within / above the [lo, hi] range."""
+    return np.where(values > hi, 1, np.where(values < lo, -1, 0)).astype(np.int8)
@@ -0,0 +1,74 @@
+"""
+FarmEase Backend — Model Warm-up
+────────────────────────────────
+Loads every model concurrently at startup and runs one dummy inference on
+each, so the first real request doesn't pay for the TensorFlow import,
+model deserialization or graph tracing. Tracks readiness for /health/ready.
+"""
+
+import asyncio
+import time
+from typing import Iterable
+
+from app.routes import crop, disease, fertilizer  # noqa: F401 — importing registers their models
+from app.registry import get_registry
+
+_state: dict = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "models": {},
+}
+
+
+async def _warm_one(name: str) -> None:
+    start = time.perf_counter()
+    try:
+        # The registry runs the slot's warm-up inference as part of the load
+        active = await asyncio.to_thread(get_registry().get, name)
+        _state["models"][name] = {
+            "loaded": active is not None,
+            "version": active.version if active else None,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+    except Exception as e:
+        print(f"⚠️  Warm-up failed for {name} model: {e}")
+        _state["models"][name] = {"loaded": False, "error": str(e)}
+
+
+async def warm_up_models() -> None:
+    """Load and warm all models in parallel, then mark the app ready."""
+    _state["started_at"] = time.time()
+    await asyncio.gather(*(_warm_one(name) for name in get_registry().names()))
+    mark_ready()
+
+
+def preload_models(names: Iterable[str]) -> None:
+    """
+    Load models synchronously in this process — used by the gunicorn master
+    before it forks, so workers inherit them copy-on-write instead of each
+    loading a private copy. Their own warm-up then finds them already loaded.
+    """
+    registry = get_registry()
+    for name in names:
+        if name not in registry.names():
+            print(f"⚠️  Cannot preload unknown model {name!r}")
+            continue
+        registry.get(name)
+
+
+def mark_ready() -> None:
+    _state["ready"] = True
+    _state["finished_at"] = time.time()
+
+
+def readiness() -> dict:
+    """Snapshot of warm-up progress (safe to serialize)."""
+    return {
+        "ready": _state["ready"],
+        "models": dict(_state["models"]),
+    }
+
+
+def is_ready() -> bool:
+    return _state["ready"]
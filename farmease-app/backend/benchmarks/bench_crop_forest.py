@@ -0,0 +1,83 @@
+"""
+Crop Forest Benchmark
+─────────────────────
+Parity check + latency comparison between scikit-learn's `predict_proba`
+and the compiled array-backed predictor (app/forest.py).
+
+Run from backend/:
+    python -m benchmarks.bench_crop_forest                        # synthetic 100-tree forest
+    python -m benchmarks.bench_crop_forest --model app/models/crop_model.pkl
+
+Exits non-zero if the compiled predictor disagrees with scikit-learn.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.forest import CompiledForest, sample_inputs
+
+
+def _synthetic_forest(n_trees: int, seed: int = 0):
+    """Forest shaped like the crop model: 7 features, 22 classes."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 200, (2200, 7))
+    y = rng.integers(0, 22, 2200)
+    return RandomForestClassifier(n_estimators=n_trees, random_state=seed).fit(X, y)
+
+
+def _time_ms(fn, X: np.ndarray, repeat: int) -> float:
+    fn(X)  # warm caches / lazy init
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Path to a joblib-pickled forest (default: synthetic)")
+    parser.add_argument("--trees", type=int, default=100, help="Trees in the synthetic forest")
+    parser.add_argument("--parity-rows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", default="1,8,32,128,512,4096")
+    args = parser.parse_args()
+
+    if args.model:
+        import joblib
+        forest = joblib.load(args.model)
+    else:
+        forest = _synthetic_forest(args.trees)
+
+    compiled = CompiledForest(forest)
+
+    # ── Parity ────────────────────────────────────────────────
+    X = sample_inputs(compiled, args.parity_rows, seed=1)
+    expected = forest.predict_proba(X)
+    actual = compiled.predict_proba_compiled(X)
+    max_err = float(np.abs(expected - actual).max())
+    same_top = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    print(f"Parity over {len(X)} rows: max |Δp| = {max_err:.2e}, top-1 agreement = {same_top:.2%}")
+    if not np.allclose(expected, actual, atol=1e-9):
+        print("❌ Compiled predictor does not match scikit-learn")
+        return 1
+
+    # ── Latency ───────────────────────────────────────────────
+    print(f"\n{'rows':>6} {'sklearn ms':>11} {'compiled ms':>12} {'speed-up':>9}")
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        batch = X[:size]
+        repeat = max(3, 2000 // size)
+        sk = _time_ms(forest.predict_proba, batch, repeat)
+        cf = _time_ms(compiled.predict_proba_compiled, batch, repeat)
+        print(f"{size:>6} {sk:>11.3f} {cf:>12.3f} {sk / cf:>8.1f}×")
+
+    print("\nServing mode uses the compiled path up to CROP_COMPILED_MAX_ROWS rows "
+          f"(default {compiled.max_rows}) and scikit-learn above it.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
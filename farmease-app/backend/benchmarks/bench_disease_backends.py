@@ -0,0 +1,138 @@
+"""
+Disease Backend Benchmark
+─────────────────────────
+Accuracy parity + latency + memory of the disease CNN runtimes
+(app/backends.py), using Keras as the reference.
+
+Run from backend/:
+    python -m benchmarks.bench_disease_backends --samples data/leaves/
+    python -m benchmarks.bench_disease_backends --backends keras,tflite --batch-sizes 1,16
+
+Each backend runs in a fresh process so load time and RSS aren't skewed by
+runtimes imported before it. Without --samples, random pixels are used —
+fine for latency, not for judging accuracy. Exits non-zero if any backend's
+top-1 agreement with Keras falls below --min-agreement.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.backends import load_backend, sample_images
+from app.config import BASE_DIR, get_settings
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _profile(kind: str, path: str, samples: np.ndarray, batch_sizes: list[int], repeat: int) -> dict:
+    """Runs in a child process: load, predict every sample, time each batch size."""
+    rss_start = _rss_mb()
+    start = time.perf_counter()
+    backend = load_backend(kind, Path(path))
+    backend.predict(samples[:1])
+    load_s = time.perf_counter() - start
+    rss_loaded = _rss_mb()
+
+    probs = np.concatenate([backend.predict(samples[i:i + 16]) for i in range(0, len(samples), 16)])
+
+    latency = {}
+    for size in batch_sizes:
+        batch = samples[np.arange(size) % len(samples)]
+        backend.predict(batch)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            backend.predict(batch)
+        latency[size] = (time.perf_counter() - start) / repeat * 1000
+
+    return {
+        "load_s": load_s,
+        "rss_start_mb": rss_start,
+        "rss_loaded_mb": rss_loaded,
+        "rss_end_mb": _rss_mb(),
+        "probs": probs,
+        "latency": latency,
+        "file_mb": Path(path).stat().st_size / 1e6,
+    }
+
+
+def main() -> int:
+    settings = get_settings()
+    paths = {
+        "keras": settings.disease_model_abs,
+        "tflite": BASE_DIR / settings.disease_tflite_model_path,
+        "onnx": BASE_DIR / settings.disease_onnx_model_path,
+    }
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="keras,tflite,onnx", help="Comma-separated; keras is the reference")
+    parser.add_argument("--samples", type=Path, help="Directory of leaf images (default: random pixels)")
+    parser.add_argument("--limit", type=int, default=64, help="Sample images to compare")
+    parser.add_argument("--batch-sizes", default="1,8,16")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    for kind, default in paths.items():
+        parser.add_argument(f"--{kind}", type=Path, default=default, help=f"{kind} model file")
+    args = parser.parse_args()
+
+    samples = sample_images(args.samples, args.limit)
+    batch_sizes = [int(s) for s in args.batch_sizes.split(",")]
+    kinds = ["keras"] + [k for k in args.backends.split(",") if k != "keras"]
+
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for kind in kinds:
+        path = getattr(args, kind)
+        if not path.exists():
+            print(f"⚠️  Skipping {kind}: {path} not found")
+            continue
+        with ctx.Pool(1) as pool:
+            try:
+                results[kind] = pool.apply(_profile, (kind, str(path), samples, batch_sizes, args.repeat))
+            except ImportError as e:
+                print(f"⚠️  Skipping {kind}: runtime not installed ({e})")
+
+    if "keras" not in results:
+        print("❌ Keras reference model unavailable — nothing to compare against")
+        return 1
+
+    # ── Parity ────────────────────────────────────────────────
+    reference = results["keras"]["probs"]
+    failed = False
+    print(f"Parity over {len(samples)} samples" + ("" if args.samples else " (random pixels)"))
+    print(f"{'backend':>8} {'top-1 agree':>12} {'max |Δp|':>9}")
+    for kind, result in results.items():
+        agreement = float((result["probs"].argmax(axis=1) == reference.argmax(axis=1)).mean())
+        max_err = float(np.abs(result["probs"] - reference).max())
+        print(f"{kind:>8} {agreement:>12.2%} {max_err:>9.4f}")
+        failed |= agreement < args.min_agreement
+
+    # ── Latency / memory ──────────────────────────────────────
+    header = "".join(f"{f'bs={b} ms':>10}" for b in batch_sizes)
+    print(f"\n{'backend':>8} {'file MB':>8} {'load s':>7} {'RSS MB':>7}{header}")
+    for kind, result in results.items():
+        times = "".join(f"{result['latency'][b]:>10.2f}" for b in batch_sizes)
+        print(f"{kind:>8} {result['file_mb']:>8.1f} {result['load_s']:>7.2f} {result['rss_end_mb']:>7.0f}{times}")
+
+    if failed:
+        print(f"\n❌ A backend agrees with Keras on fewer than {args.min_agreement:.0%} of samples")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
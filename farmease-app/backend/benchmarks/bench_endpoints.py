@@ -0,0 +1,362 @@
+"""
+Endpoint Load Test
+──────────────────
+Drives every FarmEase endpoint in-process at a fixed concurrency and
+reports p50 / p95 / p99 latency, throughput, errors and memory, then
+compares the run against a stored baseline.
+
+  • mock models: synthetic scikit-learn forests for crop / fertilizer and
+    a NumPy stand-in for the disease CNN
+  • stand-ins for Supabase (PostgREST) and OpenWeatherMap with a fixed
+    simulated round trip (benchmarks/standins.py)
+  • the app runs with its real lifespan, middleware and caches; requests
+    go through httpx's ASGI transport, so no sockets or ports are needed
+
+Run from backend/:
+    python -m benchmarks.bench_endpoints                          # all scenarios, compare to baseline
+    python -m benchmarks.bench_endpoints --scenarios crop,disease --concurrency 32
+    python -m benchmarks.bench_endpoints --save-baseline          # record a new baseline
+    python -m benchmarks.bench_endpoints --set MARKETPLACE_CACHE_ENABLED=false
+
+Exits non-zero if any scenario's p95 latency or throughput regressed by
+more than --tolerance against the baseline. Latency numbers are only
+comparable on the same machine; record the baseline where the check runs.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+OWM_BASE = "http://openweather.standin/data/2.5"
+SUPABASE_BASE = "http://supabase.standin/rest/v1"
+
+# Benchmark defaults; anything here can be overridden with --set
+BENCH_ENV = {
+    "OPENWEATHER_API_KEY": "bench",
+    "EAGER_MODEL_LOADING": "true",
+    "REGISTRY_WATCH_INTERVAL_S": "0",
+    "PREDICTION_LOG_ENABLED": "false",
+    # Every disease upload is distinct work, not a result-cache hit
+    "DISEASE_CACHE_MAX_MB": "0",
+    # One client drives all the traffic; measure capacity, not quotas
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+# ── Mock models ───────────────────────────────────────────────
+class MockDiseaseModel:
+    """Stands in for the disease CNN: a fixed projection of the batch to 38 classes."""
+
+    def __init__(self, classes: int = 38, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self._weights = rng.standard_normal((224 * 224 * 3 // 64, classes)).astype(np.float32)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        flat = batch.reshape(len(batch), -1)[:, ::64]
+        logits = flat @ self._weights
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+
+def _write_mock_models(directory: Path, trees: int) -> dict[str, str]:
+    """Synthetic crop / fertilizer forests; returns the env vars that point at them."""
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 200, (2200, 7))
+    crops = np.array(["rice", "wheat", "maize", "cotton", "chickpea", "banana", "mango", "lentil"])
+    fertilizers = np.array(["Urea", "DAP", "14-35-14", "28-28", "17-17-17", "20-20", "10-26-26"])
+
+    crop_path = directory / "crop_model.pkl"
+    fertilizer_path = directory / "fertilizer_model.pkl"
+    joblib.dump(RandomForestClassifier(n_estimators=trees, random_state=0)
+                .fit(X, crops[rng.integers(0, len(crops), len(X))]), crop_path)
+    joblib.dump(RandomForestClassifier(n_estimators=trees // 2, random_state=0)
+                .fit(X, fertilizers[rng.integers(0, len(fertilizers), len(X))]), fertilizer_path)
+    (directory / "disease_model.h5").write_bytes(b"mock")
+    return {
+        "CROP_MODEL_PATH": str(crop_path),
+        "FERTILIZER_MODEL_PATH": str(fertilizer_path),
+        "DISEASE_MODEL_PATH": str(directory / "disease_model.h5"),
+    }
+
+
+# ── Scenarios ─────────────────────────────────────────────────
+def _jpegs(count: int, seed: int = 0) -> list[bytes]:
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        # Smooth noise compresses like a photo, unlike white noise
+        small = rng.integers(0, 255, (24, 32, 3), dtype=np.uint8)
+        image = Image.fromarray(small).resize((640, 480), Image.BILINEAR)
+        buf = io.BytesIO()
+        image.save(buf, "JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images
+
+
+def _soil(rng: random.Random) -> dict:
+    return {
+        "nitrogen": rng.uniform(0, 140), "phosphorus": rng.uniform(5, 145),
+        "potassium": rng.uniform(5, 200), "temperature": rng.uniform(8, 44),
+        "humidity": rng.uniform(14, 100), "ph": rng.uniform(3.5, 9.9), "rainfall": rng.uniform(20, 300),
+    }
+
+
+def build_scenarios() -> dict[str, Callable[[random.Random], dict]]:
+    """Name → factory of httpx request kwargs (method, url, body)."""
+    images = _jpegs(64)
+    batch_rows = [_soil(random.Random(i)) for i in range(500)]
+    categories = ["all", "Vegetables", "Fruits", "Grains", "Pulses", "Spices"]
+
+    return {
+        "health": lambda rng: {"method": "GET", "url": "/health"},
+        "disease": lambda rng: {
+            "method": "POST", "url": "/predict/disease",
+            "files": {"file": ("leaf.jpg", rng.choice(images), "image/jpeg")},
+        },
+        "crop": lambda rng: {"method": "POST", "url": "/predict/crop", "json": _soil(rng)},
+        "crop_batch": lambda rng: {"method": "POST", "url": "/predict/crop/batch", "json": batch_rows},
+        "fertilizer": lambda rng: {
+            "method": "POST", "url": "/predict/fertilizer",
+            "json": {
+                **{k: v for k, v in _soil(rng).items() if k not in ("ph", "rainfall")},
+                "moisture": rng.uniform(20, 70), "soil_type": rng.choice(["Loam", "Clay", "Sandy"]),
+                "crop_type": rng.choice(["rice", "wheat", "maize"]),
+            },
+        },
+        "weather": lambda rng: {
+            "method": "GET", "url": "/api/weather",
+            "params": {"lat": rng.uniform(8, 35), "lon": rng.uniform(68, 97)},
+        },
+        "marketplace_list": lambda rng: {
+            "method": "GET", "url": "/api/marketplace/products",
+            "params": {"category": rng.choice(categories), "limit": 20},
+        },
+        "marketplace_search": lambda rng: {
+            "method": "GET", "url": "/api/marketplace/products",
+            "params": {"search": rng.choice(["tomato", "onion", "organic rice", "mango", "brinjol"])},
+        },
+        "marketplace_get": lambda rng: {
+            "method": "GET", "url": f"/api/marketplace/products/{uuid.UUID(int=rng.randrange(1, 5000))}",
+        },
+    }
+
+
+# ── Load generation ───────────────────────────────────────────
+async def run_scenario(client, factory, concurrency: int, duration: float, warmup: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        await client.request(**factory(rng))
+
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        local = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            request = factory(local)
+            start = time.perf_counter()
+            response = await client.request(**request)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            if "retry-after" in response.headers:
+                # Shed by admission control: back off like a well-behaved client
+                await asyncio.sleep(min(float(response.headers["retry-after"]), max(0.0, deadline - time.perf_counter())))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+        "rss_mb": round(_rss_mb(), 1),
+    }
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app import db, http_client
+    from app.main import app
+    from app.registry import get_registry
+    from app.routes import disease, weather
+    from app.warmup import is_ready
+    from benchmarks.standins import openweather_app, supabase_app
+
+    # Disease CNN → NumPy stand-in (no TensorFlow needed)
+    get_registry().register(
+        "disease", Path(os.environ["DISEASE_MODEL_PATH"]), lambda path: MockDiseaseModel(), warm=disease._warm
+    )
+
+    # Upstreams → stand-ins, before the lifespan opens its own clients
+    weather.OWM_BASE = OWM_BASE
+    http_client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=openweather_app(args.owm_latency_ms)))
+    postgrest = db.get_db()
+    postgrest.session = httpx.AsyncClient(
+        base_url=SUPABASE_BASE,
+        headers=postgrest.session.headers,
+        transport=httpx.ASGITransport(app=supabase_app(args.db_latency_ms)),
+    )
+
+    scenarios = build_scenarios()
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(scenarios)})")
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        while not is_ready():
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://farmease.bench", timeout=60) as client:
+            for i, name in enumerate(selected):
+                results[name] = await run_scenario(
+                    client, scenarios[name], args.concurrency, args.duration, args.warmup, seed=i + 1
+                )
+                _print_row(name, results[name])
+    return results
+
+
+# ── Reporting / baseline ──────────────────────────────────────
+_HEADER = f"{'scenario':<20} {'req':>6} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>7}"
+
+
+def _print_row(name: str, r: dict) -> None:
+    print(f"{name:<20} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>8.1f} "
+          f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['rss_mb']:>7.1f}")
+
+
+def _machine() -> dict:
+    return {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """Regression messages; a scenario regresses if p95 or throughput is worse by > tolerance."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        p95_limit = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + min_delta_ms)
+        if current["p95_ms"] > p95_limit:
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f} ms > {p95_limit:.2f} ms "
+                               f"(baseline {base['p95_ms']:.2f} ms)")
+        rps_floor = base["throughput_rps"] * (1 - tolerance)
+        if current["throughput_rps"] < rps_floor:
+            regressions.append(f"{name}: {current['throughput_rps']:.1f} req/s < {rps_floor:.1f} req/s "
+                               f"(baseline {base['throughput_rps']:.1f} req/s)")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {base.get('errors', 0)})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", help="Comma-separated subset (default: all)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unrecorded requests per scenario")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="Simulated Supabase round trip")
+    parser.add_argument("--owm-latency-ms", type=float, default=50.0, help="Simulated OpenWeatherMap round trip")
+    parser.add_argument("--trees", type=int, default=100, help="Trees in the synthetic crop forest")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra app setting (repeatable), e.g. CROP_COMPILED_PREDICTOR=true")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="Ignore p95 regressions smaller than this (timer noise on fast routes)")
+    parser.add_argument("--json", type=Path, help="Also write the results here")
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    models_dir = Path(tempfile.mkdtemp(prefix="farmease-bench-"))
+    env = {**BENCH_ENV, **_write_mock_models(models_dir, args.trees)}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        env[key.upper()] = value
+    os.environ.update(env)  # before app.config is imported
+
+    print(f"Concurrency {args.concurrency}, {args.duration:g} s per scenario, "
+          f"Supabase {args.db_latency_ms:g} ms, OpenWeatherMap {args.owm_latency_ms:g} ms\n")
+    print(_HEADER)
+    results = asyncio.run(run(args))
+    report = {
+        "machine": _machine(),
+        "config": {"concurrency": args.concurrency, "duration": args.duration,
+                   "db_latency_ms": args.db_latency_ms, "owm_latency_ms": args.owm_latency_ms,
+                   "trees": args.trees, "set": args.set},
+        "scenarios": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != report["config"]:
+        print("\n⚠️  Baseline was recorded with different settings; comparing anyway")
+    if baseline.get("machine") != report["machine"]:
+        print("⚠️  Baseline was recorded on a different machine; latency may not be comparable")
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("\n❌ Regressions against baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%} of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
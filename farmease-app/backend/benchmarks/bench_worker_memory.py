@@ -0,0 +1,139 @@
+"""
+Multi-worker Memory Benchmark
+─────────────────────────────
+Starts the API under gunicorn (gunicorn.conf.py) with and without
+preloading, and reports memory per process from /proc/<pid>/smaps_rollup:
+
+  RSS      pages mapped into the process (shared pages counted in full)
+  PSS      shared pages split between their sharers — Σ PSS is the real total
+  Private  pages only this process touches (its copy-on-write cost)
+
+Run from backend/ (Linux only):
+    python -m benchmarks.bench_worker_memory                      # synthetic 300-tree crop forest
+    python -m benchmarks.bench_worker_memory --crop-model app/models/crop_model.pkl --workers 4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+CROP_SAMPLE = {
+    "nitrogen": 90, "phosphorus": 42, "potassium": 43, "temperature": 20.8,
+    "humidity": 82.0, "ph": 6.5, "rainfall": 202.9,
+}
+
+
+def _smaps(pid: int) -> dict[str, float]:
+    """Memory counters of one process in MB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def _children(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(c) for c in f.read().split()]
+
+
+def _wait_ready(url: str, workers: int, timeout: float = 120.0) -> None:
+    """Poll /health/ready until enough consecutive answers say ready (one per worker, roughly)."""
+    deadline = time.monotonic() + timeout
+    ready_in_a_row = 0
+    while time.monotonic() < deadline:
+        try:
+            ready = httpx.get(f"{url}/health/ready", timeout=2).status_code == 200
+        except httpx.HTTPError:
+            ready = False
+        ready_in_a_row = ready_in_a_row + 1 if ready else 0
+        if ready_in_a_row >= workers * 4:
+            return
+        time.sleep(0.05 if ready else 0.5)
+    raise TimeoutError("Server did not become ready")
+
+
+def _measure(workers: int, preload: bool, env: dict, port: int, requests: int) -> list[tuple[str, dict]]:
+    env = {
+        **os.environ, **env,
+        "WEB_CONCURRENCY": str(workers),
+        "PRELOAD_APP": "true" if preload else "false",
+        "PORT": str(port),
+        "REGISTRY_WATCH_INTERVAL_S": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        _wait_ready(url, workers)
+        # Touch the models in every worker, as real traffic would
+        with httpx.Client(timeout=10) as client:
+            for _ in range(requests):
+                client.post(f"{url}/predict/crop", json=CROP_SAMPLE).raise_for_status()
+        time.sleep(0.5)
+        rows = [("master", _smaps(server.pid))]
+        rows += [(f"worker {pid}", _smaps(pid)) for pid in _children(server.pid)]
+        return rows
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _print(title: str, rows: list[tuple[str, dict]]) -> float:
+    print(f"\n{title}")
+    print(f"{'process':>16} {'RSS MB':>8} {'PSS MB':>8} {'Private MB':>11}")
+    for name, m in rows:
+        print(f"{name:>16} {m['rss']:>8.1f} {m['pss']:>8.1f} {m['private']:>11.1f}")
+    total = sum(m["pss"] for _, m in rows)
+    print(f"{'Σ PSS':>16} {total:>8.1f}")
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--crop-model", type=Path, help="Joblib crop model (default: synthetic forest)")
+    parser.add_argument("--trees", type=int, default=300, help="Trees in the synthetic forest")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crop_model = args.crop_model
+        if crop_model is None:
+            import joblib
+            from benchmarks.bench_crop_forest import _synthetic_forest
+
+            crop_model = Path(tmp) / "crop_model.pkl"
+            joblib.dump(_synthetic_forest(args.trees), crop_model)
+        print(f"Crop model: {crop_model} ({crop_model.stat().st_size / 1e6:.1f} MB on disk), {args.workers} workers")
+
+        env = {"CROP_MODEL_PATH": str(crop_model.resolve())}
+        totals = {}
+        for preload in (False, True):
+            rows = _measure(args.workers, preload, env, args.port, args.requests)
+            totals[preload] = _print(f"preload_app={preload}", rows)
+
+    saved = totals[False] - totals[True]
+    print(f"\nPreloading saves {saved:.1f} MB in total ({saved / args.workers:.1f} MB per worker)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
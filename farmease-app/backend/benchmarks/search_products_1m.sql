@@ -0,0 +1,145 @@
+-- ============================================================
+-- FarmEase — product search benchmark (synthetic 1M-product catalog)
+--
+--   psql "$DATABASE_URL" -f benchmarks/search_products_1m.sql
+--
+-- Builds `bench.products` with the same columns, generated search_vector
+-- and indexes as public.products (run supabase_schema.sql first), fills it
+-- with 1,000,000 rows and compares EXPLAIN ANALYZE for:
+--   1. the old ILIKE '%term%' filter
+--   2. full-text search on search_vector
+--   3. trigram matching of a misspelt term
+--   4. search_products() itself, ranked and paged
+--   5. keyset vs deep OFFSET listing
+-- Needs a few GB of free disk and several minutes to load. Drop the schema
+-- at the end (last line) when done.
+-- ============================================================
+
+\timing on
+
+DROP SCHEMA IF EXISTS bench CASCADE;
+CREATE SCHEMA bench;
+
+-- Seller rows for the users join; no FK to auth.users in the benchmark
+CREATE TABLE bench.users (LIKE public.users INCLUDING DEFAULTS);
+ALTER TABLE bench.users ADD PRIMARY KEY (id);
+INSERT INTO bench.users (id, phone, name, role)
+SELECT gen_random_uuid(), '+91' || (9000000000 + g)::TEXT, 'Farmer ' || g, 'farmer'
+FROM generate_series(1, 5000) AS g;
+
+-- INCLUDING ALL copies the generated column and every index
+CREATE TABLE bench.products (LIKE public.products INCLUDING ALL);
+
+-- ── Load ─────────────────────────────────────────────────────
+-- Indexes are dropped and rebuilt after the load; much faster than
+-- maintaining GIN indexes row by row
+DO $$
+DECLARE idx RECORD;
+BEGIN
+    FOR idx IN SELECT indexname FROM pg_indexes
+               WHERE schemaname = 'bench' AND tablename = 'products' AND indexname NOT LIKE '%pkey'
+    LOOP
+        EXECUTE format('DROP INDEX bench.%I', idx.indexname);
+    END LOOP;
+END $$;
+
+WITH
+    crops AS (SELECT ARRAY[
+        'Tomato', 'Potato', 'Onion', 'Brinjal', 'Okra', 'Cabbage', 'Cauliflower',
+        'Carrot', 'Spinach', 'Chilli', 'Garlic', 'Ginger', 'Wheat', 'Rice', 'Maize',
+        'Bajra', 'Jowar', 'Mango', 'Banana', 'Papaya', 'Guava', 'Pomegranate',
+        'Grapes', 'Orange', 'Lemon', 'Cotton', 'Soybean', 'Groundnut', 'Mustard',
+        'Turmeric', 'Coriander', 'Cumin', 'Chickpea', 'Lentil', 'Moong', 'Sugarcane'
+    ] AS a),
+    grades AS (SELECT ARRAY[
+        'Organic', 'Fresh', 'Premium', 'Desi', 'Hybrid', 'Farm', 'Grade A', 'Export Quality'
+    ] AS a),
+    categories AS (SELECT ARRAY[
+        'Vegetables', 'Fruits', 'Grains', 'Pulses', 'Spices', 'Oilseeds', 'Cash Crops'
+    ] AS a),
+    places AS (SELECT ARRAY[
+        'Nashik', 'Pune', 'Indore', 'Ludhiana', 'Guntur', 'Kolar', 'Anand', 'Jalgaon'
+    ] AS a),
+    sellers AS (SELECT array_agg(id) AS a FROM bench.users)
+INSERT INTO bench.products
+    (name, description, price, unit, quantity, category, seller_id, location, is_available, created_at)
+SELECT
+    grades.a[1 + (g * 7) % 8] || ' ' || crops.a[1 + (g * 13) % 36],
+    'Harvested this week near ' || places.a[1 + g % 8]
+        || '. Naturally ripened, sorted and packed on the farm. Lot ' || g,
+    round((10 + random() * 490)::NUMERIC, 2),
+    'kg',
+    1 + (g % 500),
+    categories.a[1 + (g * 13) % 36 % 7],
+    sellers.a[1 + g % 5000],
+    places.a[1 + g % 8],
+    g % 10 <> 0,
+    now() - (g || ' seconds')::INTERVAL
+FROM generate_series(1, 1000000) AS g, crops, grades, categories, places, sellers;
+
+CREATE INDEX ON bench.products(category);
+CREATE INDEX ON bench.products(seller_id);
+CREATE INDEX ON bench.products(is_available);
+CREATE INDEX ON bench.products(is_available, category, created_at DESC, id DESC);
+CREATE INDEX ON bench.products(is_available, created_at DESC, id DESC);
+CREATE INDEX ON bench.products USING GIN (search_vector);
+CREATE INDEX ON bench.products USING GIN (name gin_trgm_ops);
+ANALYZE bench.users;
+ANALYZE bench.products;
+
+-- Unqualified names (and search_products()'s body) now resolve to bench.*
+SET search_path = bench, public;
+
+-- ── 1. Old path: ILIKE '%term%' (sequential scan) ───────────
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM products
+WHERE is_available AND name ILIKE '%tomato%'
+ORDER BY created_at DESC, id DESC
+LIMIT 21;
+
+-- ── 2. Full text (GIN on search_vector) ──────────────────────
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, name, ts_rank_cd(search_vector, websearch_to_tsquery('english', 'organic tomatoes')) AS rank
+FROM products
+WHERE is_available AND search_vector @@ websearch_to_tsquery('english', 'organic tomatoes')
+ORDER BY rank DESC
+LIMIT 21;
+
+-- ── 3. Typo: "tomatoe" / "brinjol" (GIN trigram) ─────────────
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id, name, word_similarity('brinjol', name) AS sim
+FROM products
+WHERE is_available AND 'brinjol' <% name
+ORDER BY sim DESC
+LIMIT 21;
+
+-- ── 4. The API's query: search_products() ───────────────────
+-- Timed end to end (\timing); the plan of a SQL function's body is hidden
+-- from EXPLAIN unless auto_explain.log_nested_statements is on
+SELECT count(*) FROM search_products('tomatoe', result_limit => 21);
+SELECT count(*) FROM search_products('organic mango', 'Fruits', 50, 300, NULL, 21, 0);
+SELECT count(*) FROM search_products('brinjol', result_limit => 21, result_offset => 200);
+
+-- ── 5. Listing: deep OFFSET vs keyset cursor ────────────────
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM products
+WHERE is_available AND category = 'Vegetables'
+ORDER BY created_at DESC, id DESC
+OFFSET 200000 LIMIT 21;
+
+-- The cursor a client would hold after 200,000 rows (fetched once, untimed)
+SELECT created_at AS cursor_ts, id AS cursor_id FROM products
+WHERE is_available AND category = 'Vegetables'
+ORDER BY created_at DESC, id DESC
+OFFSET 200000 LIMIT 1 \gset
+
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM products
+WHERE is_available AND category = 'Vegetables'
+  AND (created_at, id) < (:'cursor_ts'::TIMESTAMPTZ, :'cursor_id'::UUID)
+ORDER BY created_at DESC, id DESC
+LIMIT 21;
+
+RESET search_path;
+
+-- DROP SCHEMA bench CASCADE;
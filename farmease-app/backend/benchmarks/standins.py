@@ -0,0 +1,150 @@
+"""
+Upstream Stand-ins
+──────────────────
+Small ASGI apps that answer like Supabase's PostgREST API and
+OpenWeatherMap, for benchmarking the API without network access,
+credentials or rate limits. They are wired in through httpx transports
+(see bench_endpoints.py), so no sockets are opened; each response waits
+for a fixed latency to stand in for the network round trip.
+
+`RedisStandin` plays Redis for the shared rate-limit buckets.
+"""
+
+import asyncio
+import json
+import math
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.routes.weather import _mock_current_weather, _mock_forecast
+
+CATEGORIES = ("Vegetables", "Fruits", "Grains", "Pulses", "Spices")
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _product(n: int) -> dict:
+    return {
+        "id": str(uuid.UUID(int=n + 1)),
+        "name": f"Lot {n}",
+        "description": "Synthetic benchmark product",
+        "price": 10 + n % 490,
+        "unit": "kg",
+        "quantity": 1 + n % 500,
+        "category": CATEGORIES[n % len(CATEGORIES)],
+        "image_url": None,
+        "seller_id": str(uuid.UUID(int=10**6 + n % 500)),
+        "location": "Nashik",
+        "lat": 18 + (n % 997) / 997 * 4,
+        "lon": 72 + (n % 991) / 991 * 4,
+        "is_available": True,
+        "created_at": (_EPOCH - timedelta(seconds=n)).isoformat(),
+        "updated_at": _EPOCH.isoformat(),
+        "users": {"name": f"Farmer {n % 500}", "phone": None, "avatar_url": None},
+    }
+
+
+def _limit(value, default: int = 20) -> int:
+    try:
+        return min(int(value), 1000)
+    except (TypeError, ValueError):
+        return default
+
+
+def supabase_app(latency_ms: float = 5.0) -> FastAPI:
+    """PostgREST stand-in: products table reads / writes and the RPC functions."""
+    app = FastAPI()
+    delay = latency_ms / 1000
+
+    @app.get("/rest/v1/products")
+    async def select_products(request: Request):
+        await asyncio.sleep(delay)
+        params = request.query_params
+        ids = params.get("id", "")
+        if ids.startswith("eq."):
+            return [_product(uuid.UUID(ids[3:]).int - 1)]
+        if ids.startswith("in.("):
+            return [_product(uuid.UUID(i).int - 1) for i in ids[4:-1].split(",")]
+        start = int(params.get("offset", 0))
+        return [_product(start + i) for i in range(_limit(params.get("limit")))]
+
+    @app.post("/rest/v1/rpc/{function}")
+    async def rpc(function: str, request: Request):
+        await asyncio.sleep(delay)
+        body = json.loads(await request.body() or b"{}")
+        start = int(body.get("result_offset") or 0)
+        return [_product(start + i) for i in range(_limit(body.get("result_limit")))]
+
+    @app.api_route("/rest/v1/{table}", methods=["POST", "PATCH"])
+    async def write(table: str, request: Request):
+        await asyncio.sleep(delay)
+        body = json.loads(await request.body() or b"null")
+        rows = body if isinstance(body, list) else [body]
+        return JSONResponse(rows, status_code=201 if request.method == "POST" else 200)
+
+    return app
+
+
+def openweather_app(latency_ms: float = 50.0) -> FastAPI:
+    """OpenWeatherMap stand-in for /data/2.5/weather and /forecast."""
+    app = FastAPI()
+    delay = latency_ms / 1000
+
+    @app.get("/data/2.5/weather")
+    async def current(lat: float, lon: float):
+        await asyncio.sleep(delay)
+        return _mock_current_weather(lat, lon)
+
+    @app.get("/data/2.5/forecast")
+    async def forecast(lat: float, lon: float):
+        await asyncio.sleep(delay)
+        return _mock_forecast(lat, lon)
+
+    return app
+
+
+class RedisStandin:
+    """In-memory Redis for app.rate_limit.RedisBuckets.
+
+    Runs the token-bucket script's logic in Python against one shared dict
+    of hashes with expiry, so several RateLimiter instances (one per
+    simulated worker) can share buckets. Optional latency per call.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.delay = latency_ms / 1000
+        self.hashes: dict[str, tuple[dict[str, float], float]] = {}  # key → (fields, expires at)
+        self.calls = 0
+
+    def register_script(self, source: str):
+        if "HMGET" not in source:
+            raise NotImplementedError("RedisStandin only runs the rate-limit script")
+        return self._take
+
+    async def _take(self, keys: list[str], args: list[float]) -> bytes:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        now = time.time()
+        levels, wait = [], 0.0
+        for i, key in enumerate(keys):
+            rate, burst = float(args[2 * i]), float(args[2 * i + 1])
+            fields, expires = self.hashes.get(key, ({}, math.inf))
+            tokens = burst
+            if fields and now < expires:
+                tokens = min(burst, fields["t"] + max(0.0, now - fields["ts"]) * rate)
+            levels.append(tokens)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+        if wait > 0:
+            return str(wait).encode()
+        for i, key in enumerate(keys):
+            rate, burst = float(args[2 * i]), float(args[2 * i + 1])
+            self.hashes[key] = ({"t": levels[i] - 1, "ts": now}, now + math.ceil(burst / rate * 1000) / 1000)
+        return b"0"
+
+    async def aclose(self) -> None:
+        pass
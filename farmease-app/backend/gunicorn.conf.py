@@ -0,0 +1,45 @@
+"""
+FarmEase Backend — Gunicorn Config (multi-worker mode)
+──────────────────────────────────────────────────────
+Runs N uvicorn workers behind one gunicorn master so inference can use
+more than one core. The master imports the app and loads the fork-safe
+models (FORK_PRELOAD_MODELS) *before* forking; workers share those pages
+copy-on-write instead of each deserializing a private copy.
+
+Run from backend/:
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app.main:app
+
+See DEPLOYMENT.md for sizing and measured memory per worker.
+"""
+
+import gc
+import os
+
+from app.config import get_settings
+
+settings = get_settings()
+
+bind = f"{settings.host}:{settings.port}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Import app.main (and register models) in the master; PRELOAD_APP=false to disable
+preload_app = os.environ.get("PRELOAD_APP", "true").lower() != "false"
+# A worker's first TensorFlow load can take a while
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Master only, after the app is imported and before any worker forks."""
+    if not preload_app:
+        return
+    from app.warmup import preload_models
+
+    preload_models(settings.fork_preload_models)
+    # Move everything allocated so far out of the GC's reach: collections in
+    # the workers would otherwise write to every shared object's header and
+    # un-share its page
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded models %s; forking %d workers", settings.fork_preload_models, workers)
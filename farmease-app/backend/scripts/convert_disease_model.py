@@ -0,0 +1,104 @@
+"""
+Disease Model Converter
+───────────────────────
+Exports the Keras disease CNN (`.h5`) to a lighter runtime format for
+DISEASE_BACKEND=tflite / onnx.
+
+Run from backend/:
+    python -m scripts.convert_disease_model --format tflite --quantize float16
+    python -m scripts.convert_disease_model --format tflite --quantize int8 --samples data/leaves/
+    python -m scripts.convert_disease_model --format onnx
+    python -m scripts.convert_disease_model --format onnx --quantize dynamic
+
+Quantization modes:
+    none     float32 weights
+    float16  float16 weights (≈½ size, near-identical outputs)       [tflite]
+    dynamic  int8 weights, float activations                          [tflite, onnx]
+    int8     full integer; calibrated on --samples (float32 I/O kept) [tflite]
+
+Check the result with `python -m benchmarks.bench_disease_backends`.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.backends import sample_images
+from app.config import BASE_DIR, get_settings
+
+TFLITE_MODES = ("none", "float16", "dynamic", "int8")
+ONNX_MODES = ("none", "dynamic")
+
+
+def _to_tflite(model, quantize: str, samples) -> bytes:
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        converter.representative_dataset = lambda: ([sample[None]] for sample in samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def _to_onnx(model, quantize: str, output: Path) -> None:
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = [tf.TensorSpec((None, 224, 224, 3), tf.float32, name="input")]
+    if quantize == "none":
+        tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=str(output))
+        return
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    float_path = output.with_suffix(".float.onnx")
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=str(float_path))
+    quantize_dynamic(str(float_path), str(output), weight_type=QuantType.QInt8)
+    float_path.unlink()
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=("tflite", "onnx"), required=True)
+    parser.add_argument("--quantize", default="none", choices=sorted(set(TFLITE_MODES + ONNX_MODES)))
+    parser.add_argument("--model", type=Path, default=settings.disease_model_abs, help="Source .h5 model")
+    parser.add_argument("--output", type=Path, help="Default: the path DISEASE_<FORMAT>_MODEL_PATH points to")
+    parser.add_argument("--samples", type=Path, help="Leaf images for int8 calibration")
+    parser.add_argument("--calibration-size", type=int, default=200)
+    args = parser.parse_args()
+
+    allowed = TFLITE_MODES if args.format == "tflite" else ONNX_MODES
+    if args.quantize not in allowed:
+        parser.error(f"--quantize {args.quantize} is not supported for {args.format} (use {', '.join(allowed)})")
+    if args.quantize == "int8" and args.samples is None:
+        parser.error("--quantize int8 needs --samples to calibrate activation ranges")
+
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(str(args.model))
+    output = args.output or BASE_DIR / (
+        settings.disease_tflite_model_path if args.format == "tflite" else settings.disease_onnx_model_path
+    )
+    # Write next to the target and rename, so the registry watcher never sees a partial file
+    tmp = output.with_name(output.name + ".tmp")
+
+    if args.format == "tflite":
+        samples = sample_images(args.samples, args.calibration_size) if args.quantize == "int8" else None
+        tmp.write_bytes(_to_tflite(model, args.quantize, samples))
+    else:
+        _to_onnx(model, args.quantize, tmp)
+    tmp.replace(output)
+
+    size_mb = output.stat().st_size / 1e6
+    source_mb = args.model.stat().st_size / 1e6
+    print(f"✅ Wrote {output} ({size_mb:.1f} MB, source {source_mb:.1f} MB, quantize={args.quantize})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -56,6 +56,40 @@ CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
 CREATE INDEX IF NOT EXISTS idx_products_seller ON products(seller_id);
 CREATE INDEX IF NOT EXISTS idx_products_available ON products(is_available);
 
+-- Keyset pagination: listings are ordered by (created_at DESC, id DESC) and
+-- a page starts after the previous page's last key, so each page is an
+-- index range scan instead of an OFFSET that reads and discards rows
+CREATE INDEX IF NOT EXISTS idx_products_listing
+    ON products(is_available, category, created_at DESC, id DESC);
+-- Same for the unfiltered "all categories" listing
+CREATE INDEX IF NOT EXISTS idx_products_listing_all
+    ON products(is_available, created_at DESC, id DESC);
+
+-- Product search: weighted full-text vector (name > category > description)
+-- kept up to date by Postgres itself, plus trigram indexes for typo tolerance
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_products_search ON products USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING GIN (name gin_trgm_ops);
+
+-- "Near me": the app writes lat/lon; geo is derived from them and GiST
+-- indexed for radius filters (ST_DWithin) and nearest-first ordering (<->)
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION CHECK (lat BETWEEN -90 AND 90);
+ALTER TABLE products ADD COLUMN IF NOT EXISTS lon DOUBLE PRECISION CHECK (lon BETWEEN -180 AND 180);
+ALTER TABLE products ADD COLUMN IF NOT EXISTS geo GEOGRAPHY(Point, 4326)
+    GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(lon, lat), 4326)::geography) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_products_geo ON products USING GIST (geo);
+
 -- RLS: anyone can browse; only owner can modify
 ALTER TABLE products ENABLE ROW LEVEL SECURITY;
 
@@ -76,6 +110,133 @@ CREATE POLICY "Farmers can delete own products"
     USING (auth.uid() = seller_id);
 
 
+-- Ranked product search (called by GET /api/marketplace/products?search=…).
+-- A row matches on full text (stemmed words anywhere in name / category /
+-- description) or on trigram word similarity to the name, which catches
+-- typos like "tomatoe" or "brinjol". Both predicates are GIN-indexed.
+CREATE OR REPLACE FUNCTION search_products(
+    q TEXT,
+    filter_category TEXT DEFAULT NULL,
+    min_price NUMERIC DEFAULT NULL,
+    max_price NUMERIC DEFAULT NULL,
+    filter_seller UUID DEFAULT NULL,
+    result_limit INT DEFAULT 20,
+    result_offset INT DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    description TEXT,
+    price NUMERIC,
+    unit TEXT,
+    quantity NUMERIC,
+    category TEXT,
+    image_url TEXT,
+    seller_id UUID,
+    location TEXT,
+    is_available BOOLEAN,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    users JSONB,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', q) AS tsq
+    )
+    SELECT
+        p.id, p.name, p.description, p.price, p.unit, p.quantity, p.category,
+        p.image_url, p.seller_id, p.location, p.is_available, p.created_at, p.updated_at,
+        jsonb_build_object('name', u.name, 'phone', u.phone, 'avatar_url', u.avatar_url) AS users,
+        (ts_rank_cd(p.search_vector, query.tsq) + word_similarity(q, p.name))::REAL AS rank
+    FROM products p
+    CROSS JOIN query
+    LEFT JOIN users u ON u.id = p.seller_id
+    WHERE p.is_available
+      AND (p.search_vector @@ query.tsq OR q <% p.name)
+      AND (filter_category IS NULL OR p.category = filter_category)
+      AND (min_price IS NULL OR p.price >= min_price)
+      AND (max_price IS NULL OR p.price <= max_price)
+      AND (filter_seller IS NULL OR p.seller_id = filter_seller)
+    ORDER BY rank DESC, p.created_at DESC, p.id DESC
+    LIMIT result_limit
+    OFFSET result_offset;
+$$;
+
+
+-- Nearest-first product listing (GET /api/marketplace/products?lat=…&lon=…).
+-- ORDER BY geo <-> point walks the GiST index outward from the origin, so
+-- the first page costs the same at national scale as in one district.
+CREATE OR REPLACE FUNCTION nearby_products(
+    origin_lat DOUBLE PRECISION,
+    origin_lon DOUBLE PRECISION,
+    radius_km DOUBLE PRECISION DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    min_price NUMERIC DEFAULT NULL,
+    max_price NUMERIC DEFAULT NULL,
+    filter_seller UUID DEFAULT NULL,
+    result_limit INT DEFAULT 20,
+    result_offset INT DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    description TEXT,
+    price NUMERIC,
+    unit TEXT,
+    quantity NUMERIC,
+    category TEXT,
+    image_url TEXT,
+    seller_id UUID,
+    location TEXT,
+    lat DOUBLE PRECISION,
+    lon DOUBLE PRECISION,
+    is_available BOOLEAN,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    users JSONB,
+    distance_km DOUBLE PRECISION
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        p.id, p.name, p.description, p.price, p.unit, p.quantity, p.category,
+        p.image_url, p.seller_id, p.location, p.lat, p.lon, p.is_available,
+        p.created_at, p.updated_at,
+        jsonb_build_object('name', u.name, 'phone', u.phone, 'avatar_url', u.avatar_url) AS users,
+        ST_Distance(p.geo, ST_SetSRID(ST_MakePoint(origin_lon, origin_lat), 4326)::geography) / 1000 AS distance_km
+    FROM products p
+    LEFT JOIN users u ON u.id = p.seller_id
+    WHERE p.is_available
+      AND p.geo IS NOT NULL
+      AND (radius_km IS NULL OR ST_DWithin(
+          p.geo, ST_SetSRID(ST_MakePoint(origin_lon, origin_lat), 4326)::geography, radius_km * 1000))
+      AND (filter_category IS NULL OR p.category = filter_category)
+      AND (min_price IS NULL OR p.price >= min_price)
+      AND (max_price IS NULL OR p.price <= max_price)
+      AND (filter_seller IS NULL OR p.seller_id = filter_seller)
+    ORDER BY p.geo <-> ST_SetSRID(ST_MakePoint(origin_lon, origin_lat), 4326)::geography
+    LIMIT result_limit
+    OFFSET result_offset;
+$$;
+
+
+-- Bulk price / quantity update (PATCH /api/marketplace/products/bulk):
+-- every patch applied in one statement. items = [{"id", "price"?, "quantity"?}]
+CREATE OR REPLACE FUNCTION bulk_update_products(items JSONB)
+RETURNS SETOF products
+LANGUAGE sql
+AS $$
+    UPDATE products p
+    SET price = coalesce(i.price, p.price),
+        quantity = coalesce(i.quantity, p.quantity)
+    FROM jsonb_to_recordset(items) AS i(id UUID, price NUMERIC, quantity NUMERIC)
+    WHERE p.id = i.id
+    RETURNING p.*;
+$$;
+
+
 -- ── 3. Orders ────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS orders (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
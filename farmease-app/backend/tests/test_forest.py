@@ -0,0 +1,50 @@
+"""CompiledForest must reproduce scikit-learn's predict_proba exactly."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.forest import CompiledForest, compile_forest, sample_inputs
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 200, (600, 7))
+    y = rng.choice(["rice", "maize", "chickpea", "banana"], len(X))
+    return RandomForestClassifier(n_estimators=25, max_depth=12, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def compiled(forest):
+    return CompiledForest(forest, max_rows=128)
+
+
+@pytest.mark.parametrize("rows", [1, 7, 128, 1000])
+def test_compiled_matches_sklearn(forest, compiled, rows):
+    X = sample_inputs(compiled, rows, seed=rows)
+    np.testing.assert_array_equal(compiled.predict_proba_compiled(X), forest.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_inputs_on_split_thresholds(forest, compiled):
+    # Exactly at a threshold goes left, as in sklearn (after the float32 cast)
+    splits = ~compiled.is_leaf
+    X = np.tile(np.float32(100.0), (len(compiled.threshold[splits]), 7)).astype(np.float64)
+    X[np.arange(len(X)), compiled.feature[splits]] = compiled.threshold[splits]
+    np.testing.assert_array_equal(compiled.predict_proba_compiled(X), forest.predict_proba(X))
+
+
+def test_large_batches_use_sklearn(forest, compiled, monkeypatch):
+    X = sample_inputs(compiled, compiled.max_rows + 1)
+    monkeypatch.setattr(compiled, "predict_proba_compiled", lambda X: pytest.fail("compiled path used"))
+    np.testing.assert_array_equal(compiled.predict_proba(X), forest.predict_proba(X))
+
+
+def test_rejects_wrong_shape(compiled):
+    with pytest.raises(ValueError):
+        compiled.predict_proba_compiled(np.zeros((3, 6)))
+
+
+def test_compile_forest_returns_compiled_on_parity(forest):
+    assert isinstance(compile_forest(forest), CompiledForest)